@@ -1,7 +1,86 @@
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+def _recurrence_sine(f, t_start, dt, start, stop, block_size=4096, renorm_interval=64):
+    """
+    用复相量旋转递推生成 sin(2π f (t_start + i·dt))，i = start, ..., stop-1
+
+    采样按 block_size 分块：块内相位因子 exp(iω·dt·j) 只计算一次；
+    块起点相量由 exp(iω·dt·block_size) 逐块递推并归一化模长，
+    每 renorm_interval 块再用 np.exp 精确重新锚定一次，从而使累积漂移有界。
+    每个采样点只需两次乘法和一次加法，而不是一次超越函数调用。
+    """
+    n = stop - start
+    if n <= 0:
+        return np.empty(0)
+    n_blocks = -(-n // block_size)
+    n_anchors = -(-n_blocks // renorm_interval)
+    omega_dt = 2 * np.pi * f * dt
+
+    # 块内相位因子
+    base = np.exp(1j * omega_dt * np.arange(block_size))
+
+    # 块起点相对锚点的旋转：递推后归一化模长
+    steps = np.full(renorm_interval, np.exp(1j * omega_dt * block_size))
+    steps[0] = 1
+    rotations = np.cumprod(steps)
+    rotations /= np.abs(rotations)
+
+    # 精确计算的锚点相量
+    anchor_index = start + np.arange(n_anchors) * (renorm_interval * block_size)
+    anchors = np.exp(1j * 2 * np.pi * f * (t_start + anchor_index * dt))
+    block_starts = np.multiply.outer(anchors, rotations).ravel()[:n_blocks]
+
+    # Im(s·b) = Im(s)·Re(b) + Re(s)·Im(b)
+    wave = np.multiply.outer(block_starts.imag, base.real)
+    wave += np.multiply.outer(block_starts.real, base.imag)
+    return wave.ravel()[:n]
+
+def _sine_wave(A, f, t, engine):
+    """按指定引擎计算 A·sin(2π f t)，t 为 np.linspace 生成的等间隔时间数组"""
+    if engine == "sin":
+        return A * np.sin(2 * np.pi * f * t)
+    if engine == "recurrence":
+        dt = (t[-1] - t[0]) / (len(t) - 1) if len(t) > 1 else 0.0
+        return A * _recurrence_sine(f, t[0] if len(t) else 0.0, dt, 0, len(t))
+    raise ValueError(f"未知的 engine: {engine!r}，可选 'sin' 或 'recurrence'")
+
+def _wrapped_sine(f, t, dtype):
+    """
+    以约化相位计算 sin(2π f t)，结果为指定精度
+
+    f·t 先在 float64 下取小数部分(周期数约化到 [0, 1))，再转换为 dtype 求正弦，
+    因此即使 t 很大，float32 结果的相位误差也只有 ~2π·ε32，而不是 ~2π·f·t·ε32。
+    """
+    cycles = np.multiply(f, t)
+    np.mod(cycles, 1.0, out=cycles)
+    phase = cycles.astype(dtype)
+    phase *= dtype.type(2 * np.pi)
+    return np.sin(phase, out=phase)
 
-def simulate_beat_frequency(f1=440, f2=444, A1=1.0, A2=1.0, t_start=0, t_end=1, num_points=5000, show_plot=True):
+def _sine_wave_blocks(A, f, t_start, dt, num_points, engine, dtype, chunk_size=65536):
+    """分块计算 A·sin(2π f (t_start + i·dt))，直接写入 dtype 数组，float64 临时数组大小有界"""
+    wave = np.empty(num_points, dtype=dtype)
+    for start in range(0, num_points, chunk_size):
+        stop = min(start + chunk_size, num_points)
+        if engine == "sin":
+            wave[start:stop] = _wrapped_sine(f, t_start + np.arange(start, stop) * dt, dtype)
+        elif engine == "recurrence":
+            wave[start:stop] = _recurrence_sine(f, t_start, dt, start, stop)
+        else:
+            raise ValueError(f"未知的 engine: {engine!r}，可选 'sin' 或 'recurrence'")
+        wave[start:stop] *= dtype.type(A)
+    return wave
+
+def simulate_beat_frequency(f1=440, f2=444, A1=1.0, A2=1.0, t_start=0, t_end=1, num_points=5000, show_plot=True,
+                            engine="sin", dtype=np.float64):
     """
     模拟并可视化两个正弦波叠加产生的拍频现象
     
@@ -13,6 +92,14 @@ def simulate_beat_frequency(f1=440, f2=444, A1=1.0, A2=1.0, t_start=0, t_end=1,
         t_start (float): 时间起始点，默认0秒
         t_end (float): 时间结束点，默认1秒
         num_points (int): 采样点数，默认5000
+        engine (str): 正弦波生成方式，默认 "sin" 逐点调用 np.sin；
+            "recurrence" 使用复相量旋转递推，长信号下约快数倍。
+            两者的最大绝对偏差满足
+            |Δ| ≤ A·(2·ε·2π·f·max(|t_start|, |t_end|) + 1e-12)，ε 为 float64 机器精度，
+            该量级与 np.sin 路径自身计算相位 2πft 时的舍入误差相当
+        dtype (data-type): 输出数组的精度，默认 float64。为 float32 时时间轴与波形均为
+            float32，相位以约化形式计算，对任意长的时间跨度都有
+            |Δ| ≤ (A1 + A2)·2·2π·ε32 ≈ 1.5e-6·(A1 + A2)（相对 float64 路径）
     
     返回:
         tuple: 包含三个元素的元组
@@ -24,12 +111,20 @@ def simulate_beat_frequency(f1=440, f2=444, A1=1.0, A2=1.0, t_start=0, t_end=1,
         >>> t, wave, beat = simulate_beat_frequency(f1=440, f2=444)
         >>> print(f"拍频频率: {beat}Hz")
     """
-    # 生成时间范围
-    t = np.linspace(t_start, t_end, num_points)
+    dtype = np.dtype(dtype)
+    if dtype == np.float64:
+        # 生成时间范围
+        t = np.linspace(t_start, t_end, num_points)
 
-    # 生成两个正弦波
-    wave1 = A1 * np.sin(2 * np.pi * f1 * t)
-    wave2 = A2 * np.sin(2 * np.pi * f2 * t)
+        # 生成两个正弦波
+        wave1 = _sine_wave(A1, f1, t, engine)
+        wave2 = _sine_wave(A2, f2, t, engine)
+    else:
+        # 低精度路径：时间轴直接以 dtype 生成，相位在 float64 下约化后再转换
+        t = np.linspace(t_start, t_end, num_points, dtype=dtype)
+        dt = (t_end - t_start) / (num_points - 1) if num_points > 1 else 0.0
+        wave1 = _sine_wave_blocks(A1, f1, t_start, dt, num_points, engine, dtype)
+        wave2 = _sine_wave_blocks(A2, f2, t_start, dt, num_points, engine, dtype)
 
     # 叠加两个波
     superposed_wave = wave1 + wave2
@@ -65,28 +160,605 @@ def simulate_beat_frequency(f1=440, f2=444, A1=1.0, A2=1.0, t_start=0, t_end=1,
         plt.show()
     return t, superposed_wave, beat_frequency
 
-def parameter_sensitivity_analysis():
+def simulate_beat_frequency_batch(f1, f2, A1=1.0, A2=1.0, t_start=0, t_end=1, num_points=5000, dtype=np.float64):
+    """
+    批量模拟多组参数(f1, f2, A1, A2)下的拍频波形
+
+    所有参数组共享同一条时间轴，正弦计算通过广播一次完成，
+    避免在 Python 循环中反复调用 simulate_beat_frequency。
+
+    参数:
+        f1, f2 (float 或 array_like): 两个波的频率(Hz)，可为标量或一维数组
+        A1, A2 (float 或 array_like): 两个波的振幅，可为标量或一维数组
+        t_start (float): 时间起始点，默认0秒
+        t_end (float): 时间结束点，默认1秒
+        num_points (int): 采样点数，默认5000
+        dtype (data-type): 时间轴与波形的精度，默认 float64；float32 时相位以约化形式计算，
+            误差界见 simulate_beat_frequency
+
+    返回:
+        tuple: 包含三个元素的元组
+            - t (ndarray): 共享的时间数组，形状 (num_points,)
+            - superposed_waves (ndarray): 叠加波形，形状 (n_configs, num_points)
+            - beat_frequencies (ndarray): 各组参数的拍频，形状 (n_configs,)
+
+    注意:
+        结果数组大小为 n_configs × num_points 个元素，
+        例如 10000 组 × 5000 点在 float64 下约占 400MB 内存，float32 下减半；
+        计算按行分块进行，除结果外的临时数组不超过约 2^20 个元素（float64 下约 8MB）。
+
+    示例:
+        >>> t, waves, beats = simulate_beat_frequency_batch([440, 300], [444, 305])
+        >>> waves.shape
+        (2, 5000)
+    """
+    # 将所有参数广播为相同长度的一维数组
+    f1, f2, A1, A2 = np.broadcast_arrays(*(np.atleast_1d(np.asarray(p, dtype=float))
+                                           for p in (f1, f2, A1, A2)))
+    if f1.ndim != 1:
+        raise ValueError("f1, f2, A1, A2 必须为标量或一维数组")
+
+    dtype = np.dtype(dtype)
+    if dtype != np.float64:
+        # 低精度路径：按行分块，float64 临时数组不超过约 2^20 个元素
+        t64 = np.linspace(t_start, t_end, num_points)
+        superposed_waves = np.empty((len(f1), num_points), dtype=dtype)
+        rows_per_block = max(1, 2**20 // max(num_points, 1))
+        for row in range(0, len(f1), rows_per_block):
+            rows = slice(row, row + rows_per_block)
+            block = _wrapped_sine(f1[rows, np.newaxis], t64, dtype)
+            block *= A1[rows, np.newaxis].astype(dtype)
+            wave2 = _wrapped_sine(f2[rows, np.newaxis], t64, dtype)
+            wave2 *= A2[rows, np.newaxis].astype(dtype)
+            block += wave2
+            superposed_waves[rows] = block
+        return t64.astype(dtype), superposed_waves, np.abs(f1 - f2)
+
+    # 生成共享的时间范围
+    t = np.linspace(t_start, t_end, num_points)
+    omega_t = 2 * np.pi * t
+
+    # 广播计算两个正弦波并原地叠加；第二个波按行分块计算，
+    # 临时数组不超过约 2^20 个元素，完整大小的数组只有输出本身
+    superposed_waves = np.empty((len(f1), num_points))
+    rows_per_block = max(1, 2**20 // max(num_points, 1))
+    for row in range(0, len(f1), rows_per_block):
+        rows = slice(row, row + rows_per_block)
+        block = superposed_waves[rows]
+        np.multiply.outer(f1[rows], omega_t, out=block)
+        np.sin(block, out=block)
+        block *= A1[rows, np.newaxis]
+        wave2 = np.multiply.outer(f2[rows], omega_t)
+        np.sin(wave2, out=wave2)
+        wave2 *= A2[rows, np.newaxis]
+        block += wave2
+
+    # 计算拍频
+    beat_frequencies = np.abs(f1 - f2)
+
+    return t, superposed_waves, beat_frequencies
+
+def simulate_beat_frequency_chunks(f1=440, f2=444, A1=1.0, A2=1.0, t_start=0, t_end=1, num_points=5000,
+                                   chunk_size=65536, engine="sin", dtype=np.float64):
+    """
+    以生成器方式分块产生拍频波形，内存占用与总采样点数无关
+
+    每一块的时间点都由全局采样序号计算，与 np.linspace(t_start, t_end, num_points)
+    的采样完全一致，因此相邻块之间相位连续，可直接写入 WAV 文件或交给后续分析。
+
+    参数:
+        f1, f2 (float): 两个波的频率(Hz)
+        A1, A2 (float): 两个波的振幅
+        t_start, t_end (float): 时间范围(s)
+        num_points (int): 总采样点数
+        chunk_size (int): 每块的采样点数，默认65536
+        engine (str): 正弦波生成方式，"sin" 或 "recurrence"，见 simulate_beat_frequency
+        dtype (data-type): 输出块的精度，默认 float64
+
+    生成:
+        tuple: (t_chunk, superposed_chunk)，每块长度不超过 chunk_size
+
+    示例:
+        >>> for t_chunk, wave_chunk in simulate_beat_frequency_chunks(num_points=10**8):
+        ...     writer.writeframes(wave_chunk.astype(np.float32).tobytes())
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size 必须为正整数")
+
+    dtype = np.dtype(dtype)
+    # 与 np.linspace 相同的采样间隔
+    dt = (t_end - t_start) / (num_points - 1) if num_points > 1 else 0.0
+
+    for start in range(0, num_points, chunk_size):
+        stop = min(start + chunk_size, num_points)
+        # 由全局序号生成时间点，保证块与块之间相位连续
+        t_chunk = t_start + np.arange(start, stop) * dt
+        if stop == num_points and num_points > 1:
+            t_chunk[-1] = t_end
+
+        if dtype != np.float64:
+            superposed_chunk = _sine_wave_blocks(A1, f1, t_start + start * dt, dt, stop - start, engine, dtype)
+            superposed_chunk += _sine_wave_blocks(A2, f2, t_start + start * dt, dt, stop - start, engine, dtype)
+            t_chunk = t_chunk.astype(dtype)
+        elif engine == "recurrence":
+            superposed_chunk = A1 * _recurrence_sine(f1, t_start, dt, start, stop)
+            superposed_chunk += A2 * _recurrence_sine(f2, t_start, dt, start, stop)
+        else:
+            superposed_chunk = _sine_wave(A1, f1, t_chunk, engine)
+            superposed_chunk += _sine_wave(A2, f2, t_chunk, engine)
+        yield t_chunk, superposed_chunk
+
+def benchmark_engines(sizes=(10**6, 10**7, 10**8), chunk_size=2**22):
+    """
+    比较 "sin" 与 "recurrence" 两种正弦引擎的耗时与误差
+
+    为使 1e8 采样点的测试内存有界，统一通过 simulate_beat_frequency_chunks 分块计算。
+
+    参数:
+        sizes (sequence of int): 测试的总采样点数
+        chunk_size (int): 分块大小
+
+    返回:
+        list of dict: 每个规模对应的 sin 耗时、recurrence 耗时、加速比和最大绝对偏差
+    """
+    print(f"{'采样点数':<12}{'sin (秒)':<15}{'recurrence (秒)':<18}{'加速比':<10}{'最大偏差':<15}")
+    results = []
+    for n in sizes:
+        start_time = time.perf_counter()
+        for _ in simulate_beat_frequency_chunks(num_points=n, chunk_size=chunk_size, engine="sin"):
+            pass
+        sin_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for _ in simulate_beat_frequency_chunks(num_points=n, chunk_size=chunk_size, engine="recurrence"):
+            pass
+        recurrence_time = time.perf_counter() - start_time
+
+        # 误差只在第一块上检查，避免再次遍历全部数据
+        sin_chunks = simulate_beat_frequency_chunks(num_points=n, chunk_size=chunk_size, engine="sin")
+        rec_chunks = simulate_beat_frequency_chunks(num_points=n, chunk_size=chunk_size, engine="recurrence")
+        max_error = np.max(np.abs(next(sin_chunks)[1] - next(rec_chunks)[1]))
+
+        speedup = sin_time / recurrence_time
+        print(f"{n:<12.0e}{sin_time:<15.4f}{recurrence_time:<18.4f}{speedup:<10.2f}{max_error:<15.3e}")
+        results.append({"num_points": n, "sin_time": sin_time, "recurrence_time": recurrence_time,
+                        "speedup": speedup, "max_error": max_error})
+    return results
+
+# simulate_multitone 在 method="auto" 时切换到 FFT 合成的音数阈值
+MULTITONE_FFT_THRESHOLD = 32
+
+def _multitone_direct(frequencies, amplitudes, phases, t_start, dt, num_points, dtype=np.float64,
+                      chunk_size=65536):
+    """按时间分块做矩阵-向量求和：wave = A · sin(2π f t + φ)"""
+    wave = np.empty(num_points, dtype=dtype)
+    for start in range(0, num_points, chunk_size):
+        stop = min(start + chunk_size, num_points)
+        t_chunk = t_start + np.arange(start, stop) * dt
+        arguments = np.multiply.outer(2 * np.pi * frequencies, t_chunk)
+        arguments += phases[:, np.newaxis]
+        wave[start:stop] = amplitudes @ np.sin(arguments, out=arguments)
+    return wave
+
+def _multitone_fft(frequencies, amplitudes, phases, t_start, dt, num_points, dtype=np.float64,
+                   block_size=4096, n_terms=20):
+    """
+    逆 FFT 合成：任意(非整数频点)频率的多音信号
+
+    每个长度为 L 的时间块内，把 f·dt·L 拆成最近的整数频点 m 与小数偏移 δ (|δ| ≤ 1/2)，
+    以块中心 u = 0 展开 exp(2πi δ u / L) 的泰勒级数。第 p 项对所有音求和恰好是一次
+    长度 L 的逆 FFT，于是每块只需 n_terms 次 FFT，代价与音数基本无关。
+    由于 |2π δ u / L| ≤ π/2，截断误差不超过 (π/2)^n_terms / n_terms! · ΣA，
+    n_terms=20 时约为 3e-15 · ΣA。
+    """
+    block_size = min(block_size, num_points + num_points % 2)
+    wave = np.empty(num_points, dtype=dtype)
+
+    cycles = frequencies * dt * block_size
+    bins = np.rint(cycles)
+    delta = cycles - bins
+    bins = bins.astype(np.int64)
+    # 以块中心为原点时，整数频点带来 (-1)^m 的相位因子
+    sign = np.where(bins % 2 == 0, 1.0, -1.0)
+    bins %= block_size
+    delta_powers = delta ** np.arange(n_terms)[:, np.newaxis]
+    x = 2j * np.pi * (np.arange(block_size) - block_size / 2) / block_size
+
+    for start in range(0, num_points, block_size):
+        center = start + block_size / 2
+        weights = amplitudes * sign * np.exp(1j * (2 * np.pi * frequencies * (t_start + center * dt) + phases))
+        weighted = delta_powers * weights
+
+        coefficients = np.empty((n_terms, block_size), dtype=complex)
+        for p in range(n_terms):
+            coefficients[p].real = np.bincount(bins, weighted[p].real, block_size)
+            coefficients[p].imag = np.bincount(bins, weighted[p].imag, block_size)
+        terms = np.fft.ifft(coefficients, axis=1) * block_size
+
+        # 霍纳法则求 Σ x^p / p! · terms[p]
+        total = terms[-1]
+        for p in range(n_terms - 2, -1, -1):
+            total = total * (x / (p + 1)) + terms[p]
+
+        stop = min(start + block_size, num_points)
+        wave[start:stop] = total.imag[:stop - start]
+    return wave
+
+def simulate_multitone(frequencies, amplitudes, phases=None, t_start=0, t_end=1, num_points=5000, method="auto",
+                       dtype=np.float64):
+    """
+    模拟 N 个正弦波的叠加，是 simulate_beat_frequency 的多音推广
+
+    参数:
+        frequencies (array_like): 各音的频率(Hz)
+        amplitudes (array_like): 各音的振幅
+        phases (array_like 或 None): 各音的初相位(rad)，默认全为0
+        t_start, t_end (float): 时间范围(s)
+        num_points (int): 采样点数
+        method (str): "direct" 为矩阵-向量求和，代价 O(N·n_tones)；
+            "fft" 为分块逆 FFT 合成，代价约 O(N·log L) 且与音数基本无关；
+            "auto" 在音数不少于 MULTITONE_FFT_THRESHOLD 时选择 "fft"
+        dtype (data-type): 时间轴与波形的精度，默认 float64。内部按块以 float64 计算，
+            只在写入输出时转换
+
+    返回:
+        tuple: 包含两个元素的元组
+            - t (ndarray): 时间数组
+            - wave (ndarray): 叠加后的波形数据
+
+    示例:
+        >>> t, wave = simulate_multitone([440, 444], [1.0, 1.0])
+    """
+    frequencies, amplitudes = np.broadcast_arrays(np.atleast_1d(np.asarray(frequencies, dtype=float)),
+                                                  np.atleast_1d(np.asarray(amplitudes, dtype=float)))
+    phases = np.zeros_like(frequencies) if phases is None else \
+        np.broadcast_to(np.asarray(phases, dtype=float), frequencies.shape)
+
+    t = np.linspace(t_start, t_end, num_points, dtype=dtype)
+    dt = (t_end - t_start) / (num_points - 1) if num_points > 1 else 0.0
+
+    if method == "auto":
+        method = "fft" if len(frequencies) >= MULTITONE_FFT_THRESHOLD else "direct"
+    if method == "direct":
+        wave = _multitone_direct(frequencies, amplitudes, phases, t_start, dt, num_points, dtype)
+    elif method == "fft":
+        wave = _multitone_fft(frequencies, amplitudes, phases, t_start, dt, num_points, dtype)
+    else:
+        raise ValueError(f"未知的 method: {method!r}，可选 'auto'、'direct' 或 'fft'")
+    return t, wave
+
+def benchmark_multitone(tone_counts=(2, 8, 32, 128, 512), num_points=10**6, seed=0):
+    """
+    比较多音合成的 "direct" 与 "fft" 两种策略的耗时与偏差
+
+    参数:
+        tone_counts (sequence of int): 测试的音数
+        num_points (int): 采样点数
+        seed (int): 随机频率、振幅、相位的种子
+
+    返回:
+        list of dict: 每个音数对应的两种耗时与最大相对偏差
+    """
+    rng = np.random.default_rng(seed)
+    print(f"{'音数':<8}{'direct (秒)':<15}{'fft (秒)':<15}{'相对偏差':<15}")
+    results = []
+    for n_tones in tone_counts:
+        frequencies = rng.uniform(20, 5000, n_tones)
+        amplitudes = rng.uniform(0, 1, n_tones)
+        phases = rng.uniform(0, 2 * np.pi, n_tones)
+
+        start_time = time.perf_counter()
+        _, wave_direct = simulate_multitone(frequencies, amplitudes, phases, num_points=num_points, method="direct")
+        direct_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        _, wave_fft = simulate_multitone(frequencies, amplitudes, phases, num_points=num_points, method="fft")
+        fft_time = time.perf_counter() - start_time
+
+        rel_error = np.max(np.abs(wave_fft - wave_direct)) / np.sum(amplitudes)
+        print(f"{n_tones:<8}{direct_time:<15.4f}{fft_time:<15.4f}{rel_error:<15.3e}")
+        results.append({"n_tones": n_tones, "direct_time": direct_time, "fft_time": fft_time,
+                        "rel_error": rel_error})
+    return results
+
+def hilbert_envelope(signal):
+    """
+    用基于 FFT 的希尔伯特变换计算信号包络
+
+    参数:
+        signal (array_like): 实数采样信号
+
+    返回:
+        ndarray: 解析信号的模，即瞬时包络
+    """
+    signal = np.asarray(signal, dtype=float)
+    n = len(signal)
+    spectrum = np.fft.fft(signal)
+
+    # 构造解析信号的频域权重：正频率加倍，负频率置零
+    weights = np.zeros(n)
+    weights[0] = 1
+    if n % 2 == 0:
+        weights[n // 2] = 1
+        weights[1:n // 2] = 2
+    else:
+        weights[1:(n + 1) // 2] = 2
+
+    return np.abs(np.fft.ifft(spectrum * weights))
+
+def envelope_blocks(chunks, block_size=65536, overlap=1024):
+    """
+    以重叠保留(overlap-save)方式分块计算长信号的包络
+
+    每次对 block_size 个采样做希尔伯特变换，丢弃两端各 overlap 个受边界效应影响的
+    点后输出，相邻块之间保留 2·overlap 个采样，内存占用与信号总长度无关。
+
+    参数:
+        chunks (iterable of array_like): 依次到达的信号片段，长度任意，
+            例如 simulate_beat_frequency_chunks 产生的波形块
+        block_size (int): 每次 FFT 的长度
+        overlap (int): 每侧丢弃的边界点数
+
+    生成:
+        ndarray: 依次输出的包络片段，拼接后与输入信号等长
+    """
+    if block_size <= 2 * overlap:
+        raise ValueError("block_size 必须大于 2 * overlap")
+
+    pending = np.empty(0)
+    first = True
+    for chunk in chunks:
+        pending = np.concatenate((pending, np.asarray(chunk, dtype=float)))
+        while len(pending) >= block_size:
+            envelope = hilbert_envelope(pending[:block_size])
+            yield envelope[:block_size - overlap] if first else envelope[overlap:block_size - overlap]
+            first = False
+            pending = pending[block_size - 2 * overlap:]
+
+    # 处理剩余不足一块的采样
+    if len(pending):
+        envelope = hilbert_envelope(pending)
+        yield envelope if first else envelope[overlap:]
+
+# measure_beat_frequency 可靠估计所需的每段最少拍周期数
+MIN_BEAT_PERIODS = 4
+
+def measure_beat_frequency(envelope_chunks, sample_rate, segment_size=65536, pad_factor=4):
+    """
+    由包络片段流估计拍频
+
+    包络按 segment_size 分段，去均值并加汉宁窗后做补零 FFT，各段功率谱取平均
+    (Welch 方法)，再对谱峰做抛物线插值。内存只与 segment_size 有关。
+
+    汉宁窗主瓣宽约 ±2 个频率分辨率，且直流附近的 1 个分辨率被跳过，
+    因此每段（信号短于一段时为整个信号）至少要包含 MIN_BEAT_PERIODS = 4 个拍周期：
+    此时相对误差不超过 1e-3，8 个周期以上不超过 1e-4；
+    只有一两个拍周期时偏差可达 20%，此时会发出 RuntimeWarning。
+
+    参数:
+        envelope_chunks (iterable of array_like): 包络片段，例如 envelope_blocks 的输出
+        sample_rate (float): 采样率(Hz)
+        segment_size (int): 每段长度，决定频率分辨率 sample_rate / segment_size
+        pad_factor (int): 补零倍数
+
+    返回:
+        float: 测得的拍频(Hz)
+    """
+    power = None
+    n_fft = None
+    pending = np.empty(0)
+
+    def accumulate(segment):
+        nonlocal power, n_fft
+        if n_fft is None:
+            n_fft = pad_factor * len(segment)
+        segment = (segment - segment.mean()) * np.hanning(len(segment))
+        segment_power = np.abs(np.fft.rfft(segment, n_fft))**2
+        power = segment_power if power is None else power + segment_power
+
+    for chunk in envelope_chunks:
+        pending = np.concatenate((pending, np.asarray(chunk, dtype=float)))
+        while len(pending) >= segment_size:
+            accumulate(pending[:segment_size])
+            pending = pending[segment_size:]
+
+    # 信号短于一段时直接使用全部包络
+    if power is None:
+        if len(pending) < 4:
+            raise ValueError("信号过短，无法估计拍频")
+        accumulate(pending)
+
+    # 跳过直流附近的主瓣，在其余频点中寻找谱峰
+    start = pad_factor
+    peak = start + np.argmax(power[start:-1])
+    left, center, right = np.log(power[peak - 1:peak + 2] + np.finfo(float).tiny)
+    denominator = left - 2 * center + right
+    shift = 0.5 * (left - right) / denominator if denominator != 0 else 0.0
+
+    beat_frequency = (peak + shift) * sample_rate / n_fft
+    periods = beat_frequency * (n_fft // pad_factor) / sample_rate
+    # 周期数本身由估计值算出，留 1% 余量以免恰好 4 个周期时误报
+    if periods < 0.99 * MIN_BEAT_PERIODS:
+        warnings.warn(f"每段只包含 {periods:.1f} 个拍周期（少于 {MIN_BEAT_PERIODS} 个），"
+                      f"拍频估计可能有较大偏差，请增加记录长度或 segment_size", RuntimeWarning)
+    return beat_frequency
+
+def analyze_beat_frequency(superposed_wave, sample_rate, block_size=None, overlap=1024, segment_size=None):
+    """
+    从采样的叠加波形中测量包络和拍频
+
+    与 simulate_beat_frequency 直接返回 |f1 - f2| 不同，此函数只依赖采样数据，
+    也适用于外部录制的信号。整体复杂度为 O(n log n)。
+
+    参数:
+        superposed_wave (array_like): 叠加后的波形采样，应至少包含 MIN_BEAT_PERIODS 个拍周期，
+            见 measure_beat_frequency
+        sample_rate (float): 采样率(Hz)
+        block_size (int 或 None): 为 None 时对整个信号做一次 FFT；
+            否则按 envelope_blocks 分块计算，适合长录音
+        overlap (int): 分块时每侧丢弃的边界点数
+        segment_size (int 或 None): 测频时的分段长度，见 measure_beat_frequency；
+            为 None 时整个包络作为一段，频率分辨率由记录时长而非采样率决定
+
+    返回:
+        tuple: 包含两个元素的元组
+            - envelope (ndarray): 包络
+            - beat_frequency (float): 测得的拍频(Hz)
+
+    示例:
+        >>> t, wave, _ = simulate_beat_frequency(show_plot=False)
+        >>> envelope, beat = analyze_beat_frequency(wave, sample_rate=1 / (t[1] - t[0]))
+    """
+    superposed_wave = np.asarray(superposed_wave, dtype=float)
+    if block_size is None:
+        envelope = hilbert_envelope(superposed_wave)
+    else:
+        envelope = np.concatenate(list(envelope_blocks([superposed_wave], block_size, overlap)))
+
+    if segment_size is None:
+        segment_size = len(envelope)
+    beat_frequency = measure_beat_frequency([envelope], sample_rate, segment_size=segment_size)
+    return envelope, beat_frequency
+
+def decimate_minmax(t, wave, n_columns):
+    """
+    按像素列对波形做最小/最大值抽取
+
+    每一列只保留该列内的最小值和最大值两个点，绘制后的包络与原始曲线在该分辨率下
+    看起来完全相同，但点数从 len(wave) 降到 2 * n_columns。
+
+    参数:
+        t (ndarray): 时间数组
+        wave (ndarray): 波形数组
+        n_columns (int): 像素列数
+
+    返回:
+        tuple: 抽取后的 (t, wave)
+    """
+    n = len(wave)
+    if n <= 2 * n_columns:
+        return t, wave
+
+    # 按 linspace 划分的边界分列，各列点数相差至多 1，末尾的点不会被丢弃；
+    # 较短的列用 nan 补齐成矩形，argmin/argmax 时分别视作 +inf/-inf
+    bounds = np.linspace(0, n, n_columns + 1).astype(int)
+    starts, lengths = bounds[:-1], np.diff(bounds)
+    index = starts[:, np.newaxis] + np.arange(lengths.max())
+    valid = index < bounds[1:, np.newaxis]
+    index = np.minimum(index, n - 1)
+    columns = wave[index]
+    t_columns = t[index]
+
+    idx_min = np.argmin(np.where(valid, columns, np.inf), axis=1)
+    idx_max = np.argmax(np.where(valid, columns, -np.inf), axis=1)
+    # 保持每列内最小值与最大值的先后顺序
+    first = np.minimum(idx_min, idx_max)
+    second = np.maximum(idx_min, idx_max)
+    rows = np.arange(n_columns)
+    t_decimated = np.column_stack((t_columns[rows, first], t_columns[rows, second])).ravel()
+    wave_decimated = np.column_stack((columns[rows, first], columns[rows, second])).ravel()
+    return t_decimated, wave_decimated
+
+def _render_panel(task):
+    """在子进程中用 Agg 后端渲染单个子图并保存为文件"""
+    t, wave, title, path, figsize, dpi = task
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(1, 1, 1)
+    ax.plot(t, wave, linewidth=0.5)
+    ax.set_title(title)
+    ax.set_xlabel('Time (s)')
+    ax.set_ylabel('Amplitude')
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+def render_sensitivity_panels(output_dir, freq_diffs=(1, 2, 5, 10), amplitude_ratios=(0.5, 1.0, 2.0, 5.0),
+                              base_freq=440, fmt='png', figsize=(6, 4), dpi=100, max_workers=None,
+                              num_points=5000):
+    """
+    非交互地渲染参数敏感性分析的各个子图并写入文件
+
+    所有波形先用 simulate_beat_frequency_batch 一次算出，再按像素列做最小/最大值抽取，
+    最后在进程池中用 Agg 后端并行渲染，每个子图保存为一个文件，不调用 plt.show()。
+
+    参数:
+        output_dir (str): 输出目录，不存在时自动创建
+        freq_diffs (sequence of float): 频率差列表(Hz)
+        amplitude_ratios (sequence of float): 振幅比例列表(A2/A1)
+        base_freq (float): 基准频率(Hz)
+        fmt (str): 图像格式，如 'png' 或 'svg'
+        figsize (tuple): 单个子图尺寸(英寸)
+        dpi (int): 分辨率，同时决定抽取的像素列数
+        max_workers (int 或 None): 进程数，None 表示使用 CPU 核数
+        num_points (int): 每条波形的采样点数
+
+    返回:
+        list of str: 按频率差、振幅比例顺序排列的输出文件路径
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    n_columns = int(figsize[0] * dpi)
+
+    freq_diffs = np.asarray(freq_diffs, dtype=float)
+    amplitude_ratios = np.asarray(amplitude_ratios, dtype=float)
+    tasks = []
+
+    if len(freq_diffs):
+        t, waves, _ = simulate_beat_frequency_batch(f1=base_freq, f2=base_freq + freq_diffs, num_points=num_points)
+        for i, (diff, wave) in enumerate(zip(freq_diffs, waves)):
+            path = os.path.join(output_dir, f'freq_diff_{i:03d}.{fmt}')
+            tasks.append((*decimate_minmax(t, wave, n_columns), f'Frequency diff = {diff:g} Hz', path, figsize, dpi))
+
+    if len(amplitude_ratios):
+        t, waves, _ = simulate_beat_frequency_batch(f1=base_freq, f2=base_freq + 4, A2=amplitude_ratios,
+                                                    num_points=num_points)
+        for i, (ratio, wave) in enumerate(zip(amplitude_ratios, waves)):
+            path = os.path.join(output_dir, f'amplitude_ratio_{i:03d}.{fmt}')
+            tasks.append((*decimate_minmax(t, wave, n_columns), f'Amplitude ratio = {ratio:g}', path, figsize, dpi))
+
+    if max_workers == 1:
+        return [_render_panel(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_render_panel, tasks))
+
+def parameter_sensitivity_analysis(output_dir=None, fmt='png', freq_diffs=(1, 2, 5, 10),
+                                   amplitude_ratios=(0.5, 1.0, 2.0, 5.0), max_workers=None):
     """
     分析频率差和振幅比例对拍频现象的影响
     
     该函数会生成两套子图:
-    1. 展示不同频率差(1Hz, 2Hz, 5Hz, 10Hz)对拍频波形的影响
-    2. 展示不同振幅比例(0.5, 1.0, 2.0, 5.0)对拍频波形的影响
+    1. 展示不同频率差（默认 1Hz, 2Hz, 5Hz, 10Hz）对拍频波形的影响
+    2. 展示不同振幅比例（默认 0.5, 1.0, 2.0, 5.0）对拍频波形的影响
+    
+    参数:
+        output_dir (str 或 None): 为 None 时弹出图形窗口；否则进入非交互模式，
+            由 render_sensitivity_panels 将各子图并行渲染为文件
+        fmt (str): 非交互模式下的图像格式，'png' 或 'svg'
+        freq_diffs (sequence of float): 频率差列表(Hz)
+        amplitude_ratios (sequence of float): 振幅比例列表(A2/A1)
+        max_workers (int 或 None): 非交互模式下的进程数，None 表示使用 CPU 核数
+    
+    返回:
+        非交互模式下返回输出文件路径列表，否则返回 None
     
     注意:
-        每次调用会显示两个独立的图形窗口，分别对应频率差和振幅比例的分析
+        交互模式下每次调用会显示两个独立的图形窗口，分别对应频率差和振幅比例的分析
     
     示例:
         >>> parameter_sensitivity_analysis()
+        >>> parameter_sensitivity_analysis(output_dir='figures', fmt='svg', freq_diffs=np.arange(1, 51))
     """
+    if output_dir is not None:
+        return render_sensitivity_panels(output_dir, freq_diffs=freq_diffs, amplitude_ratios=amplitude_ratios,
+                                         fmt=fmt, max_workers=max_workers)
+
     # 不同频率差的影响
     base_freq = 440
-    freq_diffs = [1, 2, 5, 10]
-    
-    plt.figure(1,figsize=(12, 8))
-    for i, diff in enumerate(freq_diffs):
-        t, wave, _ = simulate_beat_frequency(f1=base_freq, f2=base_freq+diff,show_plot=False)
-        plt.subplot(2, 2, i+1)
+    n_rows = max(1, (len(freq_diffs) + 1) // 2)
+    t, waves, _ = simulate_beat_frequency_batch(f1=base_freq, f2=base_freq + np.asarray(freq_diffs))
+    plt.figure(1,figsize=(12, 4 * n_rows))
+    for i, (diff, wave) in enumerate(zip(freq_diffs, waves)):
+        plt.subplot(n_rows, 2, i+1)
         plt.plot(t, wave)
         plt.title(f'Frequency diff = {diff} Hz')
         plt.xlabel('Time (s)')
@@ -94,13 +766,12 @@ def parameter_sensitivity_analysis():
     plt.tight_layout()
     plt.show()
 
-
     # 不同振幅比例的影响
-    amplitude_ratios = [0.5, 1.0, 2.0, 5.0]
-    plt.figure(2,figsize=(12, 8))
-    for i, ratio in enumerate(amplitude_ratios):
-        t, wave, _ = simulate_beat_frequency(A2=ratio,show_plot=False)
-        plt.subplot(2, 2, i+1)
+    n_rows = max(1, (len(amplitude_ratios) + 1) // 2)
+    t, waves, _ = simulate_beat_frequency_batch(f1=440, f2=444, A2=np.asarray(amplitude_ratios))
+    plt.figure(2,figsize=(12, 4 * n_rows))
+    for i, (ratio, wave) in enumerate(zip(amplitude_ratios, waves)):
+        plt.subplot(n_rows, 2, i+1)
         plt.plot(t, wave)
         plt.title(f'Amplitude ratio = {ratio}')
         plt.xlabel('Time (s)')
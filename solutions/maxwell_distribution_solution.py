@@ -1,10 +1,20 @@
 import numpy as np
 from scipy.integrate import quad
+from scipy.special import erfcx, gammainc, gammaincc
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import csv
+import json
+import os
 import time
+import warnings
 
 # 最概然速率 (m/s)
 vp = 1578  
 
+# 摩尔气体常数 (J/(mol·K))
+R_GAS = 8.314462618
+
 # 麦克斯韦速率分布函数
 def maxwell_distribution(v, vp):
     """
@@ -19,97 +29,679 @@ def maxwell_distribution(v, vp):
     """
     return (4/np.sqrt(np.pi)) * (v**2 / vp**3) * np.exp(-(v**2) / (vp**2))
 
+# 分布密度在 x = v/vp 超过该值后下溢为0（exp(-x²) 小于最小正规浮点数）
+X_REPRESENTABLE = np.sqrt(-np.log(np.finfo(float).tiny))
+
+def _quad_percentage(a, b, vp, pdf=maxwell_distribution):
+    """
+    用quad计算区间[a, b]的概率百分比，pdf为分布密度函数 pdf(v, vp)
+
+    积分区间先裁剪到密度可表示的范围 [0, X_REPRESENTABLE·vp]，
+    避免在被积函数处处下溢的区间上浪费求值；使用相对容差，使极小的尾部概率不被当作0
+    """
+    b = min(b, X_REPRESENTABLE * vp)
+    if a >= b:
+        return 0.0
+    result, _ = quad(pdf, a, b, args=(vp,), epsabs=0)
+    return result * 100
+
 # 任务1：计算0到vp的概率百分比
-def percentage_0_to_vp(vp):
+def percentage_0_to_vp(vp, pdf=maxwell_distribution):
     """
     计算速率在0到vp间隔内的分子数占总分子数的百分比
     
     参数：
     vp : 最概然速率 (m/s)
+    pdf : 分布密度函数 pdf(v, vp)，默认为麦克斯韦分布，可传入计数包装器统计求值次数
     
     返回：
     百分比值
     """
-    result, _ = quad(maxwell_distribution, 0, vp, args=(vp,))
-    return result * 100
+    return _quad_percentage(0, vp, vp, pdf)
 
 # 任务2：计算0到3.3vp的概率百分比
-def percentage_0_to_3_3vp(vp):
+def percentage_0_to_3_3vp(vp, pdf=maxwell_distribution):
     """
     计算速率在0到3.3vp间隔内的分子数占总分子数的百分比
     
     参数：
     vp : 最概然速率 (m/s)
+    pdf : 分布密度函数 pdf(v, vp)，默认为麦克斯韦分布
     
     返回：
     百分比值
     """
-    result, _ = quad(maxwell_distribution, 0, 3.3*vp, args=(vp,))
-    return result * 100
+    return _quad_percentage(0, 3.3*vp, vp, pdf)
 
 # 任务3：计算3×10^4到3×10^8 m/s的概率百分比
-def percentage_3e4_to_3e8(vp):
+def percentage_3e4_to_3e8(vp, pdf=maxwell_distribution):
     """
     计算速率在3×10^4到3×10^8 m/s间隔内的分子数占总分子数的百分比
     
     参数：
     vp : 最概然速率 (m/s)
+    pdf : 分布密度函数 pdf(v, vp)，默认为麦克斯韦分布
     
     返回：
     百分比值
     """
-    result, _ = quad(maxwell_distribution, 3e4, 3e8, args=(vp,))
-    return result * 100
+    return _quad_percentage(3e4, 3e8, vp, pdf)
     
-def trapezoidal_rule(f, a, b, n):
+# 麦克斯韦速率分布的累积分布函数（闭式解）
+def maxwell_cdf(v, vp):
+    """
+    计算速率不超过v的分子所占比例，F(v) = P(3/2, x²)，x = v/vp
+
+    P 为正则化下不完全伽马函数，与 erf(x) - (2/√π)·x·exp(-x²) 相等，
+    但小x处没有两项相消，F(v) ≈ (4/(3√π))·x³ 仍有完整的相对精度
+
+    参数：
+    v : 分子速率 (m/s)，标量或数组，负值按0处理
+    vp : 最概然速率 (m/s)，标量或可与v广播的数组
+
+    返回：
+    累积概率F(v)，形状为v与vp广播后的形状
+    """
+    # 速率非负，负的v按0处理
+    x = np.maximum(np.asarray(v, dtype=float) / np.asarray(vp, dtype=float), 0)
+    return gammainc(1.5, x**2)
+
+def maxwell_sf(v, vp):
+    """
+    计算速率超过v的分子所占比例（尾部概率），S(v) = Q(3/2, x²) = 1 - F(v)
+
+    Q 为正则化上不完全伽马函数，不经过 1 - F(v) 的相减，
+    因此在远尾处仍有完整的相对精度，直到结果下溢（x ≈ 26.6）
+
+    参数：
+    v : 分子速率 (m/s)，标量或数组
+    vp : 最概然速率 (m/s)，标量或数组
+
+    返回：
+    尾部概率S(v)
+    """
+    # 速率非负，负的v按0处理
+    x = np.maximum(np.asarray(v, dtype=float) / np.asarray(vp, dtype=float), 0)
+    return gammaincc(1.5, x**2)
+
+def maxwell_log_sf(v, vp):
+    """
+    计算尾部概率的自然对数 log S(v) = -x² + log(erfcx(x) + 2x/√π)
+
+    适用于S(v)本身下溢为0的极端尾部（例如 v = 1e3·vp 时 log S ≈ -1e6）
+
+    参数：
+    v : 分子速率 (m/s)，标量或数组
+    vp : 最概然速率 (m/s)，标量或数组
+
+    返回：
+    log S(v)
+    """
+    # 速率非负，负的v按0处理
+    x = np.maximum(np.asarray(v, dtype=float) / np.asarray(vp, dtype=float), 0)
+    with np.errstate(over='ignore', invalid='ignore', divide='ignore'):
+        return np.where(np.isinf(x), -np.inf, -x**2 + np.log(erfcx(x) + (2/np.sqrt(np.pi)) * x))
+
+def log_interval_probability(v1, v2, vp):
+    """
+    计算速率在v1到v2间隔内的概率的自然对数，适用于极端尾部区间
+
+    log P = log S(v1) + log(1 - exp(log S(v2) - log S(v1)))
+
+    参数：
+    v1, v2 : 区间下限与上限 (m/s)，标量或数组，v1 < v2
+    vp : 最概然速率 (m/s)，标量或数组
+
+    返回：
+    log P
+    """
+    log_s1 = maxwell_log_sf(v1, vp)
+    log_s2 = maxwell_log_sf(v2, vp)
+    with np.errstate(divide='ignore'):
+        return log_s1 + np.log(-np.expm1(log_s2 - log_s1))
+
+def interval_probability(v1, v2, vp):
+    """
+    计算速率在v1到v2间隔内的分子所占比例（向量化）
+
+    下限超过vp时改用尾部概率之差 S(v1) - S(v2)，避免 F(v2) - F(v1) 在远尾处的相消
+
+    参数：
+    v1, v2 : 区间下限与上限 (m/s)，标量或数组
+    vp : 最概然速率 (m/s)，标量或数组
+
+    返回：
+    概率值
+    """
+    upper_tail = np.asarray(v1, dtype=float) > np.asarray(vp, dtype=float)
+    return np.where(upper_tail,
+                    maxwell_sf(v1, vp) - maxwell_sf(v2, vp),
+                    maxwell_cdf(v2, vp) - maxwell_cdf(v1, vp))
+
+@lru_cache(maxsize=4096)
+def _interval_percentage_cached(v1, v2, vp):
+    return float(interval_probability(v1, v2, vp)) * 100
+
+def percentage_interval(v1, v2, vp):
+    """
+    计算速率在v1到v2间隔内的分子数占总分子数的百分比
+
+    基于闭式CDF计算，重复的(v1, v2, vp)查询由LRU缓存直接返回
+
+    参数：
+    v1, v2 : 区间下限与上限 (m/s)
+    vp : 最概然速率 (m/s)
+
+    返回：
+    百分比值
+    """
+    return _interval_percentage_cached(float(v1), float(v2), float(vp))
+
+def _evaluate_on_nodes(f, x):
+    """
+    在节点数组x上计算f，f不支持数组输入时退回逐点计算
+    """
+    try:
+        y = np.asarray(f(x), dtype=float)
+    except (TypeError, ValueError):
+        y = None
+    if y is None or y.shape != x.shape:
+        y = np.fromiter((f(xi) for xi in x), dtype=float, count=len(x))
+    return y
+
+def most_probable_speed(T, molar_mass):
+    """
+    由温度和摩尔质量计算最概然速率 vp = sqrt(2RT/M)
+
+    参数：
+    T : 温度 (K)，标量或数组
+    molar_mass : 摩尔质量 (kg/mol)，标量或可与T广播的数组
+
+    返回：
+    最概然速率 (m/s)
+    """
+    return np.sqrt(2 * R_GAS * np.asarray(T, dtype=float) / np.asarray(molar_mass, dtype=float))
+
+def probability_table(T, molar_mass, bin_edges, out=None, chunk_elements=2**18, n_threads=None):
+    """
+    计算多种气体、多个温度下各速率区间的概率表
+
+    T与molar_mass广播后展平为n_vp个最概然速率（例如传入 T[None, :] 与 M[:, None]
+    得到气体×温度的全部组合，按行优先展平）。每行的区间概率由CDF在区间端点上的差得到，
+    下端点超过vp的区间与interval_probability一样改用尾部概率之差，远尾区间不会变成0。
+    按行分块计算，每块的临时数组不超过chunk_elements个元素，结果直接写入out；
+    给出n_threads时各块在线程池中并行计算。
+
+    参数：
+    T : 温度 (K)，标量或数组
+    molar_mass : 摩尔质量 (kg/mol)，标量或数组
+    bin_edges : 递增的速率区间端点 (m/s)，长度为n_bins + 1
+    out : 预分配的 (n_vp, n_bins) 数组，可为 np.memmap；为None时新建
+    chunk_elements : 每块临时数组的元素数上限
+    n_threads : 线程数，为None时在当前线程中串行计算
+
+    返回：
+    形状为 (n_vp, n_bins) 的概率矩阵
+    """
+    vps = most_probable_speed(T, molar_mass).ravel()
+    edges = np.asarray(bin_edges, dtype=float)
+    n_bins = len(edges) - 1
+    if out is None:
+        out = np.empty((len(vps), n_bins))
+    elif out.shape != (len(vps), n_bins):
+        raise ValueError(f"out的形状应为 {(len(vps), n_bins)}，实际为 {out.shape}")
+
+    rows_per_chunk = max(1, chunk_elements // (n_bins + 1))
+
+    def fill(start):
+        rows = slice(start, min(start + rows_per_chunk, len(vps)))
+        vp_column = vps[rows, np.newaxis]
+        cdf = maxwell_cdf(edges, vp_column)
+        np.subtract(cdf[:, 1:], cdf[:, :-1], out=out[rows])
+        # 下端点超过vp的区间改用尾部概率之差，规则与interval_probability相同
+        sf = maxwell_sf(edges, vp_column)
+        np.subtract(sf[:, :-1], sf[:, 1:], out=out[rows], where=edges[:-1] > vp_column)
+
+    starts = range(0, len(vps), rows_per_chunk)
+    if n_threads is None:
+        for start in starts:
+            fill(start)
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(fill, starts))
+    return out
+
+@lru_cache(maxsize=4)
+def _inverse_cdf_table(n_nodes=65537, x_max=8.0):
+    """
+    以 x = v/vp 为自变量的CDF查找表，与vp无关，只需计算一次
+
+    返回:
+    (cdf, x)：严格递增的CDF值及对应的x，末点的CDF为1
+    """
+    x = np.linspace(0, x_max, n_nodes)
+    cdf = maxwell_cdf(x, 1.0)
+    # 去掉尾部CDF在浮点下已等于1的重复点，保证单调递增
+    last = np.searchsorted(cdf, 1.0)
+    cdf = np.append(cdf[:last], 1.0)
+    x = x[:last + 1]
+    cdf.flags.writeable = False
+    x.flags.writeable = False
+    return cdf, x
+
+def _sample_maxwell_block(vp, size, rng, method):
+    if method == "gaussian":
+        # 三个速度分量均服从 N(0, vp²/2)，速率为其模长
+        components = rng.standard_normal((size, 3))
+        return (vp / np.sqrt(2)) * np.sqrt(np.einsum('ij,ij->i', components, components))
+    if method == "inverse_cdf":
+        cdf, x = _inverse_cdf_table()
+        return vp * np.interp(rng.random(size), cdf, x)
+    raise ValueError(f"未知的抽样方法: {method!r}，可选 'gaussian' 或 'inverse_cdf'")
+
+def maxwell_speed_chunks(vp, size, rng=None, method="gaussian", chunk_size=2**20):
+    """
+    按块生成服从麦克斯韦速率分布的随机速率，内存占用只与chunk_size有关
+
+    参数：
+    vp : 最概然速率 (m/s)
+    size : 总样本数
+    rng : numpy.random.Generator 或随机种子，为None时使用新的随机流
+    method : "gaussian" 取三个高斯分量的模长；
+             "inverse_cdf" 用CDF查找表做逆变换抽样（线性插值，速率分辨率约1.2e-4·vp）
+    chunk_size : 每块样本数
+
+    生成：
+    每块样本数组
+    """
+    rng = np.random.default_rng(rng)
+    for start in range(0, size, chunk_size):
+        yield _sample_maxwell_block(vp, min(chunk_size, size - start), rng, method)
+
+def sample_maxwell_speeds(vp, size, rng=None, method="gaussian", chunk_size=2**20):
+    """
+    批量抽取服从麦克斯韦速率分布的随机速率
+
+    参数：
+    vp : 最概然速率 (m/s)
+    size : 样本数
+    rng : numpy.random.Generator 或随机种子
+    method : "gaussian" 或 "inverse_cdf"，见 maxwell_speed_chunks
+    chunk_size : 分块大小，限制临时数组的大小
+
+    返回：
+    长度为size的速率数组 (m/s)
+    """
+    speeds = np.empty(size)
+    start = 0
+    for block in maxwell_speed_chunks(vp, size, rng, method, chunk_size):
+        speeds[start:start + len(block)] = block
+        start += len(block)
+    return speeds
+
+def _sample_maxwell_worker(task):
+    vp, size, seed_sequence, method, chunk_size = task
+    return sample_maxwell_speeds(vp, size, np.random.default_rng(seed_sequence), method, chunk_size)
+
+def sample_maxwell_speeds_parallel(vp, size, seed=None, n_workers=None, method="gaussian", chunk_size=2**20):
+    """
+    多进程并行抽取麦克斯韦速率样本
+
+    各进程使用由 SeedSequence(seed).spawn 派生的相互独立的随机流，
+    相同的seed和n_workers给出完全相同的结果。
+
+    参数：
+    vp : 最概然速率 (m/s)
+    size : 总样本数
+    seed : 根种子
+    n_workers : 进程数，默认为CPU核数
+    method : "gaussian" 或 "inverse_cdf"
+    chunk_size : 每个进程内部的分块大小
+
+    返回：
+    长度为size的速率数组 (m/s)
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    children = np.random.SeedSequence(seed).spawn(n_workers)
+    sizes = [size // n_workers + (i < size % n_workers) for i in range(n_workers)]
+    tasks = [(vp, n, child, method, chunk_size) for n, child in zip(sizes, children)]
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return np.concatenate(list(executor.map(_sample_maxwell_worker, tasks)))
+
+def trapezoidal_rule(f, a, b, n, chunk_size=2**20):
     """
     使用梯形法则计算函数f在区间[a,b]上的定积分
+
+    f在整组节点上一次性求值；节点数超过chunk_size时分块求值并累加，
+    内存占用只与chunk_size有关，因此n可以取到1e8以上。
+    f只接受标量时自动退回逐点求值。
     
     参数:
     f -- 被积函数
     a -- 积分下限
     b -- 积分上限
     n -- 区间划分数
+    chunk_size -- 每块的节点数
     
     返回:
     积分近似值
     """
     h = (b - a) / n
-    result = 0.5 * (f(a) + f(b))
-    
-    for i in range(1, n):
-        result += f(a + i * h)
-        
+    result = 0.0
+
+    for start in range(0, n + 1, chunk_size):
+        stop = min(start + chunk_size, n + 1)
+        y = _evaluate_on_nodes(f, a + np.arange(start, stop) * h)
+        result += y.sum()
+        # 端点权重为1/2
+        if start == 0:
+            result -= 0.5 * y[0]
+        if stop == n + 1:
+            result -= 0.5 * y[-1]
+
     result *= h
     return result
 
+def simpson_rule(f, a, b, n, chunk_size=2**20):
+    """
+    使用复合辛普森法则计算函数f在区间[a,b]上的定积分
+
+    参数:
+    f -- 被积函数
+    a -- 积分下限
+    b -- 积分上限
+    n -- 区间划分数，奇数时自动加1
+    chunk_size -- 每块的节点数
+
+    返回:
+    积分近似值
+    """
+    if n % 2:
+        n += 1
+    h = (b - a) / n
+    result = 0.0
+
+    for start in range(0, n + 1, chunk_size):
+        stop = min(start + chunk_size, n + 1)
+        index = np.arange(start, stop)
+        y = _evaluate_on_nodes(f, a + index * h)
+        # 内部节点权重依次为4, 2, 4, ...，端点权重为1
+        weights = np.where(index % 2 == 1, 4.0, 2.0)
+        if start == 0:
+            weights[0] = 1.0
+        if stop == n + 1:
+            weights[-1] = 1.0
+        result += np.dot(weights, y)
+
+    return result * h / 3
+
+def romberg_rule(f, a, b, tol=1e-10, max_levels=20, rtol=1e-8):
+    """
+    使用龙贝格积分法计算函数f在区间[a,b]上的定积分
+
+    每一级只在新增的中点上求值，复用上一级梯形法则的结果，
+    再用Richardson外推消去误差的低阶项。
+    被积函数只集中在宽区间的一小段内时（例如 [0, 3e8] 上的麦克斯韦分布），
+    粗网格可能完全错过它或只碰到极小的尾部值，因此收敛要求至少有一个采样点非0，
+    且相邻两级之差同时满足绝对容差tol和相对容差rtol。
+    代价是处处为0的被积函数会一直加密到max_levels；达到max_levels仍未收敛时发出RuntimeWarning。
+
+    参数:
+    f -- 被积函数
+    a -- 积分下限
+    b -- 积分上限
+    tol -- 相邻两级外推结果之差的绝对容差
+    max_levels -- 最大加密级数
+    rtol -- 相邻两级外推结果之差的相对容差
+
+    返回:
+    积分近似值
+    """
+    h = b - a
+    ends = _evaluate_on_nodes(f, np.array([a, b], dtype=float))
+    previous = [0.5 * h * ends.sum()]
+    found_nonzero = bool(np.any(ends))
+
+    for k in range(1, max_levels + 1):
+        h /= 2
+        midpoints = a + (2 * np.arange(1, 2**(k - 1) + 1) - 1) * h
+        y = _evaluate_on_nodes(f, midpoints)
+        found_nonzero = found_nonzero or bool(np.any(y))
+        row = [0.5 * previous[0] + h * y.sum()]
+        for j in range(1, k + 1):
+            row.append(row[j - 1] + (row[j - 1] - previous[j - 1]) / (4**j - 1))
+        difference = abs(row[k] - previous[k - 1])
+        if k >= 2 and found_nonzero and difference < tol and difference <= rtol * abs(row[k]):
+            return row[k]
+        previous = row
+
+    warnings.warn(f"龙贝格积分在 {max_levels} 级内未达到容差，结果可能不准确", RuntimeWarning)
+    return previous[-1]
+
+@lru_cache(maxsize=64)
+def _gauss_legendre_nodes(n):
+    nodes, weights = np.polynomial.legendre.leggauss(n)
+    nodes.flags.writeable = False
+    weights.flags.writeable = False
+    return nodes, weights
+
+def gauss_legendre(f, a, b, n=5):
+    """
+    使用n点高斯-勒让德求积计算函数f在区间[a,b]上的定积分
+
+    [-1, 1]上的节点与权重按n缓存，重复调用时不再重新计算
+
+    参数:
+    f -- 被积函数
+    a -- 积分下限
+    b -- 积分上限
+    n -- 求积节点数
+
+    返回:
+    积分近似值
+    """
+    nodes, weights = _gauss_legendre_nodes(n)
+    half_width = 0.5 * (b - a)
+    y = _evaluate_on_nodes(f, half_width * nodes + 0.5 * (b + a))
+    return half_width * np.dot(weights, y)
+
+def adaptive_simpson(f, a, b, tol=1e-10, max_depth=50, min_depth=16, rtol=1e-8):
+    """
+    使用自适应辛普森法计算函数f在区间[a,b]上的定积分
+
+    按层推进：每一层对所有尚未收敛的子区间一次性求值，
+    误差估计为 (S_左 + S_右 - S_整体) / 15，容差按子区间长度分配。
+    被积函数只集中在宽区间的一小段内时，粗的子区间可能完全错过它，
+    因此五个采样点全为0的子区间在min_depth层之前不判定收敛
+    （处处为0的区域最多加密到 2^min_depth 个子区间）；
+    此外容差同时取绝对容差tol与相对当前积分估计的rtol中较严者，
+    只碰到极小尾部值的子区间不会因绝对容差而过早收敛。
+
+    参数:
+    f -- 被积函数
+    a -- 积分下限
+    b -- 积分上限
+    tol -- 总的绝对误差容差
+    max_depth -- 最大二分层数
+    min_depth -- 全零子区间被接受前的最少二分层数
+    rtol -- 相对积分估计的误差容差
+
+    返回:
+    (积分近似值, 误差估计)；若某个子区间的误差估计不是有限值（被积函数出现 nan 或 inf），
+    该子区间不再二分，误差估计返回 inf
+    """
+    if a == b:
+        return 0.0, 0.0
+    left = np.array([a], dtype=float)
+    right = np.array([b], dtype=float)
+    ends = _evaluate_on_nodes(f, np.array([a, (a + b) / 2, b], dtype=float))
+    f_left, f_mid, f_right = ends[:1], ends[1:2], ends[2:]
+    whole = (right - left) / 6 * (f_left + 4 * f_mid + f_right)
+
+    result = 0.0
+    error = 0.0
+    for depth in range(max_depth):
+        mid = (left + right) / 2
+        y = _evaluate_on_nodes(f, np.concatenate(((left + mid) / 2, (mid + right) / 2)))
+        f_left_mid, f_right_mid = y[:len(left)], y[len(left):]
+
+        s_left = (mid - left) / 6 * (f_left + 4 * f_left_mid + f_mid)
+        s_right = (right - mid) / 6 * (f_mid + 4 * f_right_mid + f_right)
+        delta = (s_left + s_right - whole) / 15
+
+        # 收敛的子区间加上Richardson修正后累加，其余继续二分
+        # 非有限的子区间二分也无法改善，直接结束并以 inf 的误差估计报告
+        invalid = ~np.isfinite(delta)
+        estimate = abs(result) + np.sum(np.abs(s_left + s_right))
+        share = (right - left) / (b - a)
+        done = invalid | (np.abs(delta) <= min(tol, rtol * estimate) * share)
+        if depth < min_depth:
+            all_zero = (f_left == 0) & (f_left_mid == 0) & (f_mid == 0) & (f_right_mid == 0) & (f_right == 0)
+            done &= ~all_zero
+        if depth == max_depth - 1:
+            done[:] = True
+        result += np.sum(s_left[done] + s_right[done] + delta[done])
+        error += np.inf if invalid.any() else np.sum(np.abs(delta[done]))
+
+        keep = ~done
+        if not keep.any():
+            break
+        left, mid, right = left[keep], mid[keep], right[keep]
+        f_left, f_mid, f_right = f_left[keep], f_mid[keep], f_right[keep]
+        f_left_mid, f_right_mid = f_left_mid[keep], f_right_mid[keep]
+        s_left, s_right = s_left[keep], s_right[keep]
+
+        left, right = np.concatenate((left, mid)), np.concatenate((mid, right))
+        f_left, f_right = np.concatenate((f_left, f_mid)), np.concatenate((f_mid, f_right))
+        f_mid = np.concatenate((f_left_mid, f_right_mid))
+        whole = np.concatenate((s_left, s_right))
+
+    return result, error
+
+class _CountingIntegrand:
+    """记录被积函数求值次数的包装器，数组输入按元素个数计数"""
+
+    def __init__(self, f):
+        self.f = f
+        self.count = 0
+
+    def __call__(self, x, *args):
+        self.count += np.size(x)
+        return self.f(x, *args)
+
 # 使用梯形积分法计算任务1-3
-def percentage_0_to_vp_trap(vp, n=1000):
-    """使用梯形积分法计算0到vp的概率百分比"""
-    result = trapezoidal_rule(lambda v: maxwell_distribution(v, vp), 0, vp, n)
+def percentage_0_to_vp_trap(vp, n=1000, pdf=maxwell_distribution):
+    """使用梯形积分法计算0到vp的概率百分比，pdf为分布密度函数 pdf(v, vp)"""
+    result = trapezoidal_rule(lambda v: pdf(v, vp), 0, vp, n)
     return result * 100
 
-def compare_methods(task_name, quad_func, trap_func, vp, n_values=[10, 100, 1000]):
-    """比较quad和梯形积分法的结果和性能"""
+def _time_call(func, repeat=5, warmup=1):
+    """
+    对无参函数计时：先预热warmup次，再重复repeat次，以perf_counter_ns记录每次耗时
+
+    返回:
+    (函数返回值, 计时统计字典)，统计包括中位数和四分位距(IQR)，单位为纳秒
+    """
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        value = func()
+        samples.append(time.perf_counter_ns() - start)
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+    return value, {"median_ns": int(median), "iqr_ns": int(q3 - q1), "repeat": repeat, "warmup": warmup}
+
+def write_benchmark_results(results, path):
+    """
+    将compare_methods的结果写入文件，扩展名为.json时写JSON，否则写CSV
+
+    参数:
+    results -- compare_methods返回的字典列表
+    path -- 输出文件路径
+    """
+    if str(path).endswith(".json"):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(results, fh, ensure_ascii=False, indent=2)
+        return
+    fieldnames = list(dict.fromkeys(key for row in results for key in row))
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.DictWriter(fh, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(results)
+
+def compare_methods(task_name, quad_func, trap_func, vp, n_values=[10, 100, 1000], bounds=None,
+                    gauss_orders=[2, 4, 8, 16, 32], tolerances=[1e-4, 1e-8, 1e-12],
+                    repeat=5, warmup=1, output=None):
+    """
+    比较quad和梯形积分法的结果和性能
+
+    每个方法先预热warmup次，再重复repeat次，以time.perf_counter_ns计时，
+    报告耗时的中位数与四分位距(IQR)。
+    quad_func与trap_func须接受pdf关键字参数，传入的分布密度外包一层计数器，
+    统计单次积分的求值次数。给出bounds=(a, b)时，再对区间[a, b]上的麦克斯韦分布
+    比较全部积分方法，参考值取闭式CDF。
+
+    参数:
+    output -- 结果文件路径(.json或.csv)，为None时只打印
+
+    返回:
+    各方法的结果列表，每项为字典，可直接用于跟踪性能回归
+    """
     print(f"\n{task_name}的方法对比:")
+    results = []
     
     # 使用quad计算（作为参考值）
-    start_time = time.time()
-    quad_result = quad_func(vp)
-    quad_time = time.time() - start_time
-    print(f"quad方法: {quad_result:.6f}%, 耗时: {quad_time:.6f}秒")
+    pdf = _CountingIntegrand(maxwell_distribution)
+    quad_result, timing = _time_call(lambda: quad_func(vp, pdf=pdf), repeat, warmup)
+    evaluations = pdf.count // (repeat + warmup)
+    print(f"quad方法: {quad_result:.6f}%, 耗时中位数: {timing['median_ns'] / 1e9:.6f}秒, "
+          f"IQR: {timing['iqr_ns'] / 1e9:.6f}秒")
+    results.append({"task": task_name, "method": quad_func.__name__, "parameter": None, "evaluations": evaluations,
+                    "result": quad_result, "rel_error": 0.0, **timing})
     
     # 使用不同区间划分数的梯形法则
     print("\n梯形积分法结果:")
-    print(f"{'区间划分数':<12}{'结果 (%)':<15}{'相对误差 (%)':<15}{'计算时间 (秒)':<15}")
+    print(f"{'区间划分数':<12}{'结果 (%)':<15}{'相对误差 (%)':<15}{'耗时中位数 (秒)':<18}{'IQR (秒)':<15}")
     
     for n in n_values:
-        start_time = time.time()
-        trap_result = trap_func(vp, n)
-        trap_time = time.time() - start_time
+        pdf = _CountingIntegrand(maxwell_distribution)
+        trap_result, timing = _time_call(lambda: trap_func(vp, n, pdf=pdf), repeat, warmup)
+        evaluations = pdf.count // (repeat + warmup)
         rel_error = abs(trap_result - quad_result) / quad_result * 100
         
-        print(f"{n:<12}{trap_result:<15.6f}{rel_error:<15.6f}{trap_time:<15.6f}")
+        print(f"{n:<12}{trap_result:<15.6f}{rel_error:<15.6f}"
+              f"{timing['median_ns'] / 1e9:<18.6f}{timing['iqr_ns'] / 1e9:<15.6f}")
+        results.append({"task": task_name, "method": trap_func.__name__, "parameter": n, "evaluations": evaluations,
+                        "result": trap_result, "rel_error": rel_error / 100, **timing})
+
+    if bounds is not None:
+        # 全部积分方法：求值次数-误差-耗时
+        a, b = bounds
+        exact = float(interval_probability(a, b, vp))
+        runs = [("quad", None, lambda g: quad(g, a, b)[0])]
+        runs += [("trapezoid", n, lambda g, n=n: trapezoidal_rule(g, a, b, n)) for n in n_values]
+        runs += [("simpson", n, lambda g, n=n: simpson_rule(g, a, b, n)) for n in n_values]
+        runs += [("gauss_legendre", n, lambda g, n=n: gauss_legendre(g, a, b, n)) for n in gauss_orders]
+        runs += [("romberg", tol, lambda g, tol=tol: romberg_rule(g, a, b, tol)) for tol in tolerances]
+        runs += [("adaptive_simpson", tol, lambda g, tol=tol: adaptive_simpson(g, a, b, tol)[0])
+                 for tol in tolerances]
+
+        print("\n全部积分方法对比:")
+        print(f"{'方法':<18}{'参数':<12}{'求值次数':<14}{'相对误差':<15}{'耗时中位数 (秒)':<18}{'IQR (秒)':<15}")
+        for method, parameter, integrate in runs:
+            integrand = _CountingIntegrand(lambda v: maxwell_distribution(v, vp))
+            value, timing = _time_call(lambda: integrate(integrand), repeat, warmup)
+            evaluations = integrand.count // (repeat + warmup)
+            rel_error = abs(value - exact) / exact
+            print(f"{method:<18}{str(parameter):<12}{evaluations:<14}{rel_error:<15.3e}"
+                  f"{timing['median_ns'] / 1e9:<18.6f}{timing['iqr_ns'] / 1e9:<15.6f}")
+            results.append({"task": task_name, "method": method, "parameter": parameter,
+                            "evaluations": evaluations, "result": value, "rel_error": rel_error, **timing})
+
+    if output is not None:
+        write_benchmark_results(results, output)
+    return results
 
 if __name__ == "__main__":
     print("=== 使用quad方法的结果 ===")
@@ -118,6 +710,7 @@ if __name__ == "__main__":
     print("3×10^4 到 3×10^8 间概率百分比:", percentage_3e4_to_3e8(vp), "%")
     
     print("\n=== quad方法与梯形积分法对比 ===")
-    compare_methods("任务1: 0到vp", percentage_0_to_vp, percentage_0_to_vp_trap, vp)
+    compare_methods("任务1: 0到vp", percentage_0_to_vp, percentage_0_to_vp_trap, vp,
+                    n_values=[10, 100, 1000, 10**4, 10**6, 10**8], bounds=(0, vp))
 
     
\ No newline at end of file
@@ -1,5 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import os
+import struct
+import zlib
+
 import numpy as np
 import matplotlib.pyplot as plt
+from scipy.signal import find_peaks
 
 
 def setup_parameters():
@@ -33,25 +39,679 @@ def generate_grid():
     return X, Y, r
 
 
-def calculate_intensity(r, lambda_light, R_lens):
+def _air_gap_thickness(r_squared, R_lens, out):
+    """由 r² 计算空气膜厚度 d = r² / (R + sqrt(R² - r²))，结果写入 out"""
+    denominator = np.subtract(R_lens**2, r_squared, out=np.empty_like(out))
+    np.sqrt(denominator, out=denominator)
+    denominator += R_lens
+    return np.divide(r_squared, denominator, out=out)
+
+
+def _intensity_from_r_squared(r_squared, lambda_light, R_lens, out):
+    """
+    由 r² 原地计算干涉强度，out 可以与 r_squared 是同一个数组。
+
+    空气膜厚度用无相消的形式 d = r² / (R + sqrt(R² - r²))，
+    整个计算只额外分配一个与输入同样大小的临时数组。
+    """
+    _air_gap_thickness(r_squared, R_lens, out)
+    return _intensity_from_thickness(out, lambda_light, out)
+
+
+def _intensity_from_thickness(thickness, lambda_light, out):
+    """由空气膜厚度原地计算干涉强度 4·sin²(2πd/λ)，out 可以与 thickness 是同一个数组"""
+    np.multiply(thickness, 2 * np.pi / lambda_light, out=out)
+    np.sin(out, out=out)
+    np.square(out, out=out)
+    out *= 4
+    return out
+
+
+def calculate_intensity(r, lambda_light, R_lens, out=None, dtype=np.float64):
     """
     计算干涉强度分布。
 
+    空气膜厚度写成 d = r² / (R + sqrt(R² - r²))，与 R - sqrt(R² - r²) 在数学上相等，
+    但避免了两个相近数相减，小 r 处不损失精度；在 float32 下
+    R - sqrt(R² - r²) 的舍入误差约为 ε32·R ≈ 6e-9 m，相当于约 0.06 rad 的相位误差，
+    而无相消形式的相位误差只有 ~ε32 量级，因此 float32 输出下环的位置仍然准确。
+
     参数:
     r (np.ndarray): 径向距离数组
     lambda_light (float): 激光波长
     R_lens (float): 透镜曲率半径
+    out (np.ndarray): 可选的输出数组，给出时结果原地写入其中，其精度决定计算精度
+    dtype (data-type): 未给出 out 时输出数组的精度，float32 可减半内存带宽
+
+    返回:
+    np.ndarray: 干涉强度分布数组
+    """
+    r = np.asarray(r)
+    if out is None:
+        out = np.empty(r.shape, dtype=dtype)
+    np.square(r, out=out)
+    _intensity_from_r_squared(out, lambda_light, R_lens, out)
+    # 0 维输入返回标量，与逐元素公式的行为一致
+    return out if out.ndim else out[()]
+
+
+def generate_axes(num_points=1000, half_width=0.001):
+    """
+    生成模拟所需的一维坐标轴，不构造二维网格。
+
+    参数:
+    num_points (int): 每个方向的采样点数
+    half_width (float): 坐标范围的一半 (m)
+
+    返回:
+    tuple: 包含 x、y 一维坐标数组的元组
+    """
+    x = np.linspace(-half_width, half_width, num_points)
+    y = np.linspace(-half_width, half_width, num_points)
+    return x, y
+
+
+def calculate_intensity_tiled(x, y, lambda_light, R_lens, out=None, tile_size=1024, n_threads=None,
+                              dtype=np.float64):
+    """
+    按块计算干涉强度分布，适用于任意分辨率。
+
+    每一块由一维坐标 x、y 广播得到 r²，不生成完整的 X、Y、r 数组，
+    块内计算原地进行，结果直接写入 out（可以是 np.memmap），
+    内存占用除 out 外只与 tile_size 有关。
+
+    参数:
+    x (np.ndarray): x 方向一维坐标 (m)，对应输出的列
+    y (np.ndarray): y 方向一维坐标 (m)，对应输出的行
+    lambda_light (float): 激光波长
+    R_lens (float): 透镜曲率半径
+    out (np.ndarray): 预分配的 (len(y), len(x)) 输出数组，为 None 时新建
+    tile_size (int): 块的边长
+    n_threads (int): 线程数，为 None 时串行计算
+    dtype (data-type): 未给出 out 时输出数组的精度
 
     返回:
     np.ndarray: 干涉强度分布数组
     """
-    # 计算空气膜厚度
-    d = R_lens - np.sqrt(R_lens**2 - r**2)
-    # 生成干涉强度
-    intensity = 4 * np.sin(2 * np.pi * d / lambda_light)**2
+    if out is None:
+        out = np.empty((len(y), len(x)), dtype=dtype)
+    elif out.shape != (len(y), len(x)):
+        raise ValueError(f"out 的形状应为 {(len(y), len(x))}，实际为 {out.shape}")
+
+    x_squared = np.asarray(x, dtype=out.dtype)**2
+    y_squared = np.asarray(y, dtype=out.dtype)**2
+
+    def fill(tile):
+        rows, cols = tile
+        # 由一维坐标广播得到 r²，再原地计算强度
+        block = y_squared[rows, np.newaxis] + x_squared[np.newaxis, cols]
+        out[rows, cols] = _intensity_from_r_squared(block, lambda_light, R_lens, block)
+
+    tiles = [(slice(i, i + tile_size), slice(j, j + tile_size))
+             for i in range(0, len(y), tile_size) for j in range(0, len(x), tile_size)]
+    if n_threads is None:
+        for tile in tiles:
+            fill(tile)
+    else:
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            list(executor.map(fill, tiles))
+    return out
+
+
+def _sag_from_r_squared(r_squared, R_lens, conic, aspheric, out):
+    """
+    由 r² 计算二次曲面加偶次非球面的矢高，结果写入 out。
+
+    二次曲面项写成 r² / (R + sqrt(R² - (1+K)r²))，K = 0 时与 _air_gap_thickness 相同；
+    非球面项 A4·r⁴ + A6·r⁶ + ... 对 r² 用 Horner 法求值。
+    """
+    denominator = np.multiply(r_squared, -(1 + conic), dtype=out.dtype)
+    denominator += R_lens**2
+    np.sqrt(denominator, out=denominator)
+    denominator += R_lens
+    np.divide(r_squared, denominator, out=out)
+    if len(aspheric):
+        # denominator 已不再需要，复用为多项式的累加缓冲区
+        polynomial = denominator
+        polynomial.fill(aspheric[-1])
+        for coefficient in aspheric[-2::-1]:
+            polynomial *= r_squared
+            polynomial += coefficient
+        polynomial *= r_squared
+        polynomial *= r_squared
+        out += polynomial
+    return out
+
+
+def calculate_intensity_surface(x, y, lambda_light, R_lens, conic=0.0, aspheric=(), decenter=(0.0, 0.0),
+                                tilt=(0.0, 0.0), gap=0.0, out=None, tile_size=256, n_threads=None,
+                                dtype=np.float64):
+    """
+    计算非理想透镜（偏心、倾斜、二次曲面、偶次非球面）下的干涉强度分布。
+
+    空气膜厚度为
+        d(x, y) = sag(ρ²) + tx·u + ty·v + gap,  u = x - x0, v = y - y0, ρ² = u² + v²,
+        sag(ρ²) = ρ² / (R + sqrt(R² - (1+K)ρ²)) + A4·ρ⁴ + A6·ρ⁶ + ...
+    其中倾斜取小角近似，表现为叠加在空气膜上的楔形。
+    ρ² 和倾斜平面都可以拆成只依赖行与只依赖列的两部分之和，
+    因此先对一维坐标算出 u²、v²、tx·u、ty·v，每块内只需两次广播加法，
+    剩下的二次曲面与多项式只是 ρ² 的一元函数，在块内原地求值。
+    每次调用的开销只与像素数成正比，适合在拟合参数的优化器中反复调用，
+    反复调用时传入同一个 out 可以避免重新分配输出数组。
+
+    参数:
+    x (np.ndarray): x 方向一维坐标 (m)，对应输出的列
+    y (np.ndarray): y 方向一维坐标 (m)，对应输出的行
+    lambda_light (float): 激光波长
+    R_lens (float): 透镜顶点曲率半径
+    conic (float): 二次曲面常数 K，0 为球面，-1 为抛物面
+    aspheric (sequence): 偶次非球面系数 (A4, A6, ...)
+    decenter (tuple): 透镜顶点的位置 (x0, y0) (m)
+    tilt (tuple): 透镜相对平板在 x、y 方向的倾角 (tx, ty) (rad)
+    gap (float): 顶点处的空气膜厚度 (m)
+    out (np.ndarray): 预分配的 (len(y), len(x)) 输出数组，为 None 时新建
+    tile_size (int): 块的边长
+    n_threads (int): 线程数，为 None 时串行计算
+    dtype (data-type): 未给出 out 时输出数组的精度
+
+    返回:
+    np.ndarray: 干涉强度分布数组，(1+K)ρ² > R² 的点超出曲面定义域，结果为 nan
+    """
+    if out is None:
+        out = np.empty((len(y), len(x)), dtype=dtype)
+    elif out.shape != (len(y), len(x)):
+        raise ValueError(f"out 的形状应为 {(len(y), len(x))}，实际为 {out.shape}")
+    aspheric = tuple(aspheric)
+
+    # 行、列可分离部分只在一维坐标上计算一次
+    u = np.asarray(x, dtype=float) - decenter[0]
+    v = np.asarray(y, dtype=float) - decenter[1]
+    u_squared = (u**2).astype(out.dtype)
+    v_squared = (v**2).astype(out.dtype)
+    col_plane = (tilt[0] * u).astype(out.dtype)
+    row_plane = (tilt[1] * v + gap).astype(out.dtype)
+
+    def fill(tile):
+        rows, cols = tile
+        r_squared = v_squared[rows, np.newaxis] + u_squared[np.newaxis, cols]
+        thickness = _sag_from_r_squared(r_squared, R_lens, conic, aspheric, np.empty_like(r_squared))
+        thickness += row_plane[rows, np.newaxis]
+        thickness += col_plane[np.newaxis, cols]
+        out[rows, cols] = _intensity_from_thickness(thickness, lambda_light, thickness)
+
+    tiles = [(slice(i, i + tile_size), slice(j, j + tile_size))
+             for i in range(0, len(y), tile_size) for j in range(0, len(x), tile_size)]
+    with np.errstate(invalid="ignore"):
+        if n_threads is None:
+            for tile in tiles:
+                fill(tile)
+        else:
+            with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                list(executor.map(fill, tiles))
+    return out
+
+
+def _radial_lookup(s, profile, inv_ds, method):
+    """由 r² 查找径向强度剖面，s 会被原地修改；profile 可带有末尾的通道维"""
+    s *= inv_ds
+    if method == "nearest":
+        np.rint(s, out=s)
+        return profile[s.astype(np.intp)]
+    index = s.astype(np.intp)
+    s -= index
+    if profile.ndim == 2:
+        s = s[..., np.newaxis]
+    low = profile[index]
+    high = profile[index + 1]
+    high -= low
+    high *= s
+    high += low
+    return high
+
+
+def _is_symmetric(axis):
+    return np.allclose(axis, -axis[::-1], rtol=0, atol=1e-12 * max(np.abs(axis).max(), 1e-300))
+
+
+def calculate_intensity_radial(x, y, lambda_light, R_lens, method="linear", symmetry="quadrant", tol=None,
+                               band_size=256):
+    """
+    利用径向对称性计算干涉强度分布。
+
+    强度只依赖 r，因此先在均匀的 r² 网格上计算一次一维径向剖面，
+    每个像素只需计算 s = x² + y² 并查表，不再逐像素调用 sqrt 和 sin。
+    剖面的点数按 tol 自动选取：记 k = 2π/(λR)，在傍轴近似下强度为 2 - 2cos(k·s)，
+    线性插值的误差不超过 (k·Δs)²/4，取最近点的误差不超过 k·Δs/2·2 = k·Δs，
+    据此令误差不超过 tol。
+
+    坐标轴关于 0 对称时还可以镜像：symmetry="quadrant" 只计算 1/4 图像，
+    symmetry="octant" 在 x、y 坐标相同时只计算 1/8 图像。
+
+    参数:
+    x (np.ndarray): x 方向一维坐标 (m)
+    y (np.ndarray): y 方向一维坐标 (m)
+    lambda_light (float): 激光波长
+    R_lens (float): 透镜曲率半径
+    method (str): "linear" 线性插值，或 "nearest" 取最近的整数下标
+    symmetry (str): None、"quadrant" 或 "octant"
+    tol (float): 相对直接计算的强度误差上限，默认 linear 为 1e-6，nearest 为 1e-3
+    band_size (int): 分块计算的行数
+
+    返回:
+    np.ndarray: 形状为 (len(y), len(x)) 的干涉强度分布数组
+    """
+    if method not in ("linear", "nearest"):
+        raise ValueError(f"未知的 method: {method!r}，可选 'linear' 或 'nearest'")
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # 选择剖面网格间隔 Δs
+    if tol is None:
+        tol = 1e-6 if method == "linear" else 1e-3
+    k = 2 * np.pi / (lambda_light * R_lens)
+    ds = 2 * np.sqrt(tol) / k if method == "linear" else tol / k
+    s_max = np.max(x**2) + np.max(y**2)
+    n_profile = int(np.ceil(s_max / ds)) + 2
+    if n_profile > 2**27:
+        raise ValueError(f"tol={tol} 需要 {n_profile} 点的径向剖面，请放宽 tol")
+    profile = calculate_intensity(np.sqrt(np.arange(n_profile) * ds), lambda_light, R_lens)
+    inv_ds = 1 / ds
+
+    return _map_radial_profile(x, y, profile, inv_ds, method, symmetry, band_size)
+
+
+def _map_radial_profile(x, y, profile, inv_ds, method, symmetry, band_size):
+    """
+    把以 r² 为自变量的径向剖面映射到 (len(y), len(x)) 图像上，必要时利用镜像对称。
+
+    profile 为一维时得到灰度图；形状为 (n, c) 时得到 (len(y), len(x), c) 的多通道图像。
+    """
+    # 确定需要实际计算的部分
+    if symmetry not in (None, "quadrant", "octant"):
+        raise ValueError(f"未知的 symmetry: {symmetry!r}，可选 None、'quadrant' 或 'octant'")
+    if symmetry is not None and not (_is_symmetric(x) and _is_symmetric(y)):
+        symmetry = None
+    if symmetry == "octant" and not (len(x) == len(y) and np.allclose(x, y, rtol=0, atol=1e-15)):
+        symmetry = "quadrant"
+    x_part = x if symmetry is None else x[len(x) // 2:]
+    y_part = y if symmetry is None else y[len(y) // 2:]
+    x_squared = x_part**2
+    y_squared = y_part**2
+    channels = profile.shape[1:]
+
+    part = np.empty((len(y_part), len(x_part)) + channels, dtype=profile.dtype)
+    for start in range(0, len(y_part), band_size):
+        rows = slice(start, start + band_size)
+        # octant 模式下每条带只计算对角线右侧的列，左侧由转置得到
+        first_col = start if symmetry == "octant" else 0
+        s = y_squared[rows, np.newaxis] + x_squared[np.newaxis, first_col:]
+        part[rows, first_col:] = _radial_lookup(s, profile, inv_ds, method)
+        if first_col:
+            part[rows, :first_col] = part[:first_col, rows].swapaxes(0, 1)
+
+    if symmetry is None:
+        return part
+
+    # 镜像得到完整图像
+    intensity = np.empty((len(y), len(x)) + channels, dtype=profile.dtype)
+    half_y, half_x = len(y) // 2, len(x) // 2
+    intensity[half_y:, half_x:] = part
+    intensity[half_y:, :half_x] = part[:, ::-1][:, :half_x]
+    intensity[:half_y, :] = intensity[half_y:, :][::-1][:half_y]
     return intensity
 
 
+def cie_color_matching(wavelengths):
+    """
+    CIE 1931 标准观察者颜色匹配函数的解析近似（多瓣分段高斯拟合）。
+
+    参数:
+    wavelengths (np.ndarray): 波长 (m)
+
+    返回:
+    np.ndarray: 形状为 (n, 3) 的 x̄、ȳ、z̄ 值
+    """
+    nm = np.asarray(wavelengths, dtype=float) * 1e9
+
+    def lobe(mu, sigma_low, sigma_high):
+        sigma = np.where(nm < mu, sigma_low, sigma_high)
+        return np.exp(-0.5 * ((nm - mu) / sigma)**2)
+
+    x_bar = 1.056 * lobe(599.8, 37.9, 31.0) + 0.362 * lobe(442.0, 16.0, 26.7) - 0.065 * lobe(501.1, 20.4, 26.2)
+    y_bar = 0.821 * lobe(568.8, 46.9, 40.5) + 0.286 * lobe(530.9, 16.3, 31.1)
+    z_bar = 1.217 * lobe(437.0, 11.8, 36.0) + 0.681 * lobe(459.0, 26.0, 13.8)
+    return np.stack((x_bar, y_bar, z_bar), axis=-1)
+
+
+# CIE XYZ 到线性 sRGB 的转换矩阵
+XYZ_TO_LINEAR_SRGB = np.array([[3.2406, -1.5372, -0.4986],
+                               [-0.9689, 1.8758, 0.0415],
+                               [0.0557, -0.2040, 1.0570]])
+
+
+def srgb_response(wavelengths, spectral_weights):
+    """
+    由光源光谱得到每个波长对线性 sRGB 三通道的贡献矩阵。
+
+    归一化使得强度处处为 2（即非相干平均值）时最大的通道为 1，
+    因此远离中心、条纹被平均掉的区域显示为光源本身的颜色。
+
+    参数:
+    wavelengths (np.ndarray): 波长 (m)
+    spectral_weights (np.ndarray): 各波长的光谱功率权重
+
+    返回:
+    np.ndarray: 形状为 (n, 3) 的响应矩阵
+    """
+    response = np.asarray(spectral_weights, dtype=float)[:, np.newaxis] * \
+        (cie_color_matching(wavelengths) @ XYZ_TO_LINEAR_SRGB.T)
+    white = 2 * response.sum(axis=0)
+    return response / np.max(white)
+
+
+def linear_to_srgb(rgb):
+    """
+    将线性 sRGB 值裁剪到 [0, 1] 并做 sRGB 伽马编码，便于显示或保存。
+
+    参数:
+    rgb (np.ndarray): 线性 sRGB 图像
+
+    返回:
+    np.ndarray: 编码后的 sRGB 图像，取值范围 [0, 1]
+    """
+    rgb = np.clip(rgb, 0, 1)
+    return np.where(rgb <= 0.0031308, 12.92 * rgb, 1.055 * np.power(rgb, 1 / 2.4) - 0.055)
+
+
+def calculate_intensity_polychromatic(x, y, wavelengths, spectral_weights, R_lens, response=None,
+                                      symmetry="quadrant", tol=1e-4, block_size=4096, band_size=256):
+    """
+    计算多色光（白光、LED 等）照明下的牛顿环图样。
+
+    各波长共享同一个空气膜厚度剖面 d(r²)。先在一维 r² 网格上按块计算
+    强度矩阵 (块长 × 波长数)，再与响应矩阵 (波长数 × 通道数) 相乘累加到
+    通道剖面中，最后像单色情形一样由 r² 查表得到图像，不对每个波长生成二维图像。
+
+    参数:
+    x (np.ndarray): x 方向一维坐标 (m)
+    y (np.ndarray): y 方向一维坐标 (m)
+    wavelengths (np.ndarray): 波长 (m)
+    spectral_weights (np.ndarray): 各波长的光谱功率权重
+    R_lens (float): 透镜曲率半径
+    response (np.ndarray): 形状为 (n, c) 的通道响应矩阵，默认由 srgb_response 得到线性 sRGB；
+        传入 spectral_weights[:, None] 可得到光谱积分的总强度
+    symmetry (str): None、"quadrant" 或 "octant"，见 calculate_intensity_radial
+    tol (float): 相对最短波长的线性插值误差上限
+    block_size (int): 计算剖面时每块的 r² 点数
+    band_size (int): 映射到图像时每条带的行数
+
+    返回:
+    np.ndarray: 形状为 (len(y), len(x), c) 的图像，默认响应下为线性 sRGB，
+    可能略超出 [0, 1]，显示前用 linear_to_srgb 处理
+    """
+    wavelengths = np.asarray(wavelengths, dtype=float)
+    if response is None:
+        response = srgb_response(wavelengths, spectral_weights)
+    response = np.asarray(response, dtype=float)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+
+    # 剖面间隔由最短波长决定，误差界与 calculate_intensity_radial 的线性插值相同
+    k = 2 * np.pi / (wavelengths.min() * R_lens)
+    ds = 2 * np.sqrt(tol) / k
+    n_profile = int(np.ceil((np.max(x**2) + np.max(y**2)) / ds)) + 2
+
+    wave_numbers = 2 * np.pi / wavelengths
+    profile = np.empty((n_profile, response.shape[1]))
+    for start in range(0, n_profile, block_size):
+        stop = min(start + block_size, n_profile)
+        thickness = _air_gap_thickness(np.arange(start, stop) * ds, R_lens, np.empty(stop - start))
+        # 强度矩阵 4·sin²(2πd/λ)，与响应矩阵相乘后累加到通道剖面
+        phase = np.multiply.outer(thickness, wave_numbers)
+        np.sin(phase, out=phase)
+        np.square(phase, out=phase)
+        phase *= 4
+        np.matmul(phase, response, out=profile[start:stop])
+
+    return _map_radial_profile(x, y, profile, 1 / ds, "linear", symmetry, band_size)
+
+
+def radial_profile(image, pixel_size=1.0, center=None, band_size=512):
+    """
+    计算图像的方位角平均径向剖面。
+
+    每个像素按到中心的距离取整得到整数半径下标，用 np.bincount 分别累加
+    像素数、强度和半径，按行分块进行，临时数组大小只与 band_size 有关。
+
+    参数:
+    image (np.ndarray): 二维强度图像（模拟或实测）
+    pixel_size (float): 像素间距 (m)
+    center (tuple): 中心的 (行, 列) 像素坐标，默认为图像中心
+    band_size (int): 每块的行数
+
+    返回:
+    tuple: 包含各整数半径环的平均半径 (m) 与平均强度的元组，只保留有像素的环
+    """
+    image = np.asarray(image)
+    n_rows, n_cols = image.shape
+    if center is None:
+        center = ((n_rows - 1) / 2, (n_cols - 1) / 2)
+    dy_squared = (np.arange(n_rows) - center[0])**2
+    dx_squared = (np.arange(n_cols) - center[1])**2
+    n_bins = int(np.ceil(np.sqrt(dy_squared.max() + dx_squared.max()))) + 1
+
+    counts = np.zeros(n_bins)
+    intensity_sum = np.zeros(n_bins)
+    radius_sum = np.zeros(n_bins)
+    for start in range(0, n_rows, band_size):
+        rows = slice(start, start + band_size)
+        radius = np.sqrt(dy_squared[rows, np.newaxis] + dx_squared[np.newaxis, :]).ravel()
+        index = np.rint(radius).astype(np.intp)
+        counts += np.bincount(index, minlength=n_bins)
+        intensity_sum += np.bincount(index, weights=image[rows].ravel(), minlength=n_bins)
+        radius_sum += np.bincount(index, weights=radius, minlength=n_bins)
+
+    valid = counts > 0
+    return radius_sum[valid] / counts[valid] * pixel_size, intensity_sum[valid] / counts[valid]
+
+
+def find_dark_rings(radii, profile, min_depth=0.5):
+    """
+    在径向剖面中定位暗环（强度极小值）的半径。
+
+    取显著性(prominence)不小于 min_depth 的局部极小值以排除噪声，
+    再对相邻三点做抛物线插值得到亚像素精度的半径。
+
+    参数:
+    radii (np.ndarray): 径向剖面的半径 (m)
+    profile (np.ndarray): 径向剖面的强度
+    min_depth (float): 极小值的最小显著性，即相对两侧较低的那个极大值的深度
+
+    返回:
+    np.ndarray: 由内向外排列的暗环半径 (m)
+    """
+    index, _ = find_peaks(-np.asarray(profile), prominence=min_depth)
+
+    # 抛物线插值：顶点相对中间点的偏移
+    y0, y1, y2 = profile[index - 1], profile[index], profile[index + 1]
+    denominator = y0 - 2 * y1 + y2
+    shift = np.where(denominator > 0, 0.5 * (y0 - y2) / np.where(denominator > 0, denominator, 1), 0.0)
+    step = np.where(shift >= 0, radii[index + 1] - radii[index], radii[index] - radii[index - 1])
+    return radii[index] + shift * step
+
+
+def fit_ring_parameters(ring_radii, lambda_light=None, R_lens=None):
+    """
+    由暗环半径拟合透镜曲率半径或波长。
+
+    第 m 个暗环满足 r_m² = m·λ·R（傍轴近似，相对修正约 mλ/(4R)），
+    对 r² 与环序号做带截距的最小二乘直线拟合，截距吸收起始环序号未知的偏移，
+    斜率即 λR。波长与曲率半径给出其一，求另一个。
+
+    参数:
+    ring_radii (np.ndarray): 相邻暗环的半径 (m)，由内向外
+    lambda_light (float): 已知波长 (m)，此时拟合 R_lens
+    R_lens (float): 已知曲率半径 (m)，此时拟合波长
+
+    返回:
+    float: 拟合得到的 R_lens 或波长 (m)
+    """
+    if (lambda_light is None) == (R_lens is None):
+        raise ValueError("lambda_light 与 R_lens 必须且只能给出一个")
+    ring_radii = np.asarray(ring_radii, dtype=float)
+    if len(ring_radii) < 2:
+        raise ValueError("至少需要两个暗环才能拟合")
+    slope, _ = np.polyfit(np.arange(len(ring_radii)), ring_radii**2, 1)
+    return slope / lambda_light if R_lens is None else slope / R_lens
+
+
+def _analyze_ring_image(task):
+    image, pixel_size, lambda_light, R_lens, min_depth = task
+    radii, profile = radial_profile(image, pixel_size)
+    return fit_ring_parameters(find_dark_rings(radii, profile, min_depth), lambda_light, R_lens)
+
+
+def analyze_ring_images(images, pixel_size, lambda_light=None, R_lens=None, min_depth=0.5, n_workers=None):
+    """
+    批量分析一组牛顿环图像，对每幅图像拟合曲率半径或波长。
+
+    参数:
+    images (iterable): 二维图像序列，或形状为 (n, 行, 列) 的图像栈
+    pixel_size (float): 像素间距 (m)
+    lambda_light (float): 已知波长 (m)，此时拟合 R_lens
+    R_lens (float): 已知曲率半径 (m)，此时拟合波长
+    min_depth (float): 见 find_dark_rings
+    n_workers (int): 进程数；为 1 时在当前进程中串行计算
+
+    返回:
+    np.ndarray: 每幅图像的拟合结果
+    """
+    tasks = [(image, pixel_size, lambda_light, R_lens, min_depth) for image in images]
+    if n_workers == 1:
+        return np.array([_analyze_ring_image(task) for task in tasks])
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        return np.array(list(executor.map(_analyze_ring_image, tasks)))
+
+
+def intensity_to_uint8(intensity, out=None):
+    """
+    将干涉强度（取值范围 [0, 4]）线性量化为 uint8 灰度，超出范围的值被裁剪。
+
+    参数:
+    intensity (np.ndarray): 干涉强度分布数组，计算过程中会被原地修改
+    out (np.ndarray): 可选的 uint8 输出数组
+
+    返回:
+    np.ndarray: uint8 灰度图像
+    """
+    intensity *= 255 / 4
+    intensity += 0.5
+    np.clip(intensity, 0, 255, out=intensity)
+    if out is None:
+        return intensity.astype(np.uint8)
+    np.copyto(out, intensity, casting="unsafe")
+    return out
+
+
+def write_png_gray(path, image, compress_level=1):
+    """
+    不经过 matplotlib，直接把 uint8 灰度图像写成 PNG 文件。
+
+    参数:
+    path (str): 输出文件路径
+    image (np.ndarray): 形状为 (高, 宽) 的 uint8 数组
+    compress_level (int): zlib 压缩级别，级别越低写得越快
+    """
+    height, width = image.shape
+    # 每行前加一个过滤类型字节 0（不过滤）
+    raw = np.zeros((height, width + 1), dtype=np.uint8)
+    raw[:, 1:] = image
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), compress_level)))
+        f.write(chunk(b"IEND", b""))
+
+
+def _render_sweep_frames(task):
+    """在子进程中渲染一段连续的帧，写入 .npy 帧栈或 PNG 序列"""
+    start, values, parameter, x, y, settings, output, fmt = task
+    intensity = np.empty((len(y), len(x)), dtype=np.float32)
+    frames = np.load(output, mmap_mode="r+") if fmt == "npy" else None
+    frame = np.empty(intensity.shape, dtype=np.uint8)
+    for index, value in enumerate(values, start):
+        settings[parameter] = value
+        calculate_intensity_surface(x, y, out=intensity, **settings)
+        if frames is not None:
+            intensity_to_uint8(intensity, out=frames[index])
+        else:
+            write_png_gray(os.path.join(output, f"frame_{index:05d}.png"), intensity_to_uint8(intensity, out=frame))
+    if frames is not None:
+        frames.flush()
+    return len(values)
+
+
+def render_ring_sweep(output, parameter, values, x=None, y=None, lambda_light=632.8e-9, R_lens=0.1,
+                      fmt="npy", n_workers=None, frames_per_task=8, **surface):
+    """
+    对某个参数扫描，逐帧计算牛顿环并以 uint8 灰度写入帧栈或图像序列，用于制作动画。
+
+    每帧由 calculate_intensity_surface 以 float32 计算（参数取默认值时即为 calculate_intensity），
+    直接量化为 uint8 后写出，不经过 matplotlib。帧按 frames_per_task 分组，
+    由进程池并行渲染，每个进程只分配一帧大小的缓冲区，并直接写入输出文件。
+
+    参数:
+    output (str): fmt="npy" 时为 .npy 文件路径，结果是形状 (帧数, len(y), len(x)) 的 uint8 数组，
+        可以用 np.load(output, mmap_mode="r") 读取；fmt="png" 时为输出目录，不存在时自动创建
+    parameter (str): 扫描的参数名，如 "gap"、"lambda_light"、"R_lens"，可取 calculate_intensity_surface 的任一参数
+    values (sequence): 每帧的参数值
+    x (np.ndarray): x 方向一维坐标 (m)，默认为 generate_axes() 的结果
+    y (np.ndarray): y 方向一维坐标 (m)，默认与 x 相同
+    lambda_light (float): 激光波长
+    R_lens (float): 透镜曲率半径
+    fmt (str): "npy" 或 "png"
+    n_workers (int): 进程数，为 None 时使用 CPU 核数，为 1 时在当前进程中串行渲染
+    frames_per_task (int): 每个任务渲染的帧数
+    **surface: 传给 calculate_intensity_surface 的其余固定参数，如 conic、decenter、tilt
+
+    返回:
+    str 或 list of str: fmt="npy" 时为帧栈路径，fmt="png" 时为按帧排列的图像路径
+    """
+    if fmt not in ("npy", "png"):
+        raise ValueError(f"未知的 fmt: {fmt!r}，可选 'npy' 或 'png'")
+    if x is None:
+        x, _ = generate_axes()
+    if y is None:
+        y = x
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    settings = dict(surface, lambda_light=lambda_light, R_lens=R_lens)
+    values = list(values)
+
+    if fmt == "npy":
+        # 先在主进程中建立 .npy 文件，各进程再以 r+ 模式映射并写入各自的帧
+        np.lib.format.open_memmap(output, mode="w+", dtype=np.uint8, shape=(len(values), len(y), len(x))).flush()
+    else:
+        os.makedirs(output, exist_ok=True)
+
+    tasks = [(start, values[start:start + frames_per_task], parameter, x, y, settings, output, fmt)
+             for start in range(0, len(values), frames_per_task)]
+    if n_workers == 1:
+        for task in tasks:
+            _render_sweep_frames(task)
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(_render_sweep_frames, tasks))
+
+    if fmt == "npy":
+        return output
+    return [os.path.join(output, f"frame_{index:05d}.png") for index in range(len(values))]
+
+
 def plot_newton_rings(intensity):
     """
     绘制牛顿环干涉条纹图像。
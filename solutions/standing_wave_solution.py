@@ -3,7 +3,7 @@ import matplotlib.pyplot as plt
 from matplotlib import animation
 
 # 定义sineWaveZeroPhi函数
-def sineWaveZeroPhi(x, t, A, omega, k):
+def sineWaveZeroPhi(x, t, A, omega, k, dtype=np.float64):
     '''
     返回位置x和时间t的波函数值
     参数:
@@ -12,8 +12,17 @@ def sineWaveZeroPhi(x, t, A, omega, k):
     A : 振幅 (float)
     omega : 角频率 (float)
     k : 波数 (float)
+    dtype : 输出精度，默认 float64。为 float32 等低精度时，相位 kx - ωt 先在 float64 下
+            约化到 [0, 2π) 再转换，对任意大的 t 都有 |Δ| ≤ A·2·2π·ε32 ≈ 1.5e-6·A
     '''
-    return A * np.sin(k * x - omega * t)
+    dtype = np.dtype(dtype)
+    if dtype == np.float64:
+        return A * np.sin(k * x - omega * t)
+
+    phase = np.mod(k * np.asarray(x, dtype=np.float64) - omega * t, 2 * np.pi)
+    wave = np.sin(np.asarray(phase, dtype=dtype))
+    wave *= dtype.type(A)
+    return wave
 
 # 创建动画所需的 Figure 和 Axes
 fig = plt.figure()
@@ -8,6 +8,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 #from solutions.beats_simulation_solution import simulate_beat_frequency, parameter_sensitivity_analysis
 from src.beats_simulation import simulate_beat_frequency, parameter_sensitivity_analysis
+from solutions.beats_simulation_solution import (
+    simulate_beat_frequency as simulate_beat_frequency_solution,
+    simulate_beat_frequency_batch,
+    simulate_beat_frequency_chunks,
+    analyze_beat_frequency,
+    envelope_blocks,
+    measure_beat_frequency,
+    decimate_minmax,
+    simulate_multitone,
+    parameter_sensitivity_analysis as parameter_sensitivity_analysis_solution,
+)
 
 class TestBeatFrequencySimulation:
     """测试拍频模拟功能"""
@@ -51,5 +62,199 @@ class TestParameterSensitivity:
         autocorr = np.correlate(wave, wave, mode='full')
         assert np.argmax(autocorr) == len(autocorr)//2  # 应有明显自相关峰值
 
+class TestBatchSimulation:
+    """测试批量拍频模拟"""
+
+    def test_batch_matches_single(self):
+        """批量结果应与逐个调用的结果一致"""
+        f1 = np.array([440, 300, 100])
+        f2 = np.array([444, 305, 101])
+        A2 = np.array([1.0, 1.5, 0.5])
+        t, waves, beats = simulate_beat_frequency_batch(f1, f2, A1=0.5, A2=A2, t_end=2, num_points=2000)
+        assert waves.shape == (3, 2000)
+        np.testing.assert_array_equal(beats, [4, 5, 1])
+        for i in range(3):
+            t_ref, wave_ref, _ = simulate_beat_frequency_solution(
+                f1=f1[i], f2=f2[i], A1=0.5, A2=A2[i], t_end=2, num_points=2000, show_plot=False)
+            np.testing.assert_allclose(t, t_ref)
+            np.testing.assert_allclose(waves[i], wave_ref, atol=1e-9)
+
+class TestChunkedSimulation:
+    """测试分块生成拍频波形"""
+
+    def test_chunks_match_full_signal(self):
+        """拼接后的分块结果应与一次性生成的结果一致"""
+        t_ref, wave_ref, _ = simulate_beat_frequency_solution(t_end=2, num_points=10001, show_plot=False)
+        chunks = list(simulate_beat_frequency_chunks(t_end=2, num_points=10001, chunk_size=1024))
+        assert all(len(t_chunk) <= 1024 for t_chunk, _ in chunks)
+        t = np.concatenate([t_chunk for t_chunk, _ in chunks])
+        wave = np.concatenate([wave_chunk for _, wave_chunk in chunks])
+        np.testing.assert_allclose(t, t_ref, atol=1e-12)
+        np.testing.assert_allclose(wave, wave_ref, atol=1e-9)
+
+class TestRecurrenceEngine:
+    """测试相量递推正弦引擎"""
+
+    def test_recurrence_accuracy_bound(self):
+        """递推引擎与 np.sin 路径的偏差应满足文档给出的误差界"""
+        eps = np.finfo(float).eps
+        for t_end in (1, 100):
+            _, wave_sin, _ = simulate_beat_frequency_solution(
+                t_end=t_end, num_points=200001, show_plot=False)
+            _, wave_rec, _ = simulate_beat_frequency_solution(
+                t_end=t_end, num_points=200001, show_plot=False, engine="recurrence")
+            bound = 2 * (2 * eps * 2 * np.pi * 444 * t_end + 1e-12)
+            assert np.max(np.abs(wave_rec - wave_sin)) <= bound
+
+    def test_recurrence_chunks_continuous(self):
+        """递推引擎分块生成时相位应连续"""
+        _, wave_ref, _ = simulate_beat_frequency_solution(num_points=50000, show_plot=False)
+        wave = np.concatenate([w for _, w in simulate_beat_frequency_chunks(
+            num_points=50000, chunk_size=7000, engine="recurrence")])
+        np.testing.assert_allclose(wave, wave_ref, atol=1e-10)
+
+class TestBeatAnalysis:
+    """测试从采样数据测量包络与拍频"""
+
+    def test_analyze_matches_simulation(self):
+        """测得的拍频和包络应与模拟参数一致"""
+        t, wave, beat_freq = simulate_beat_frequency_solution(
+            f1=300, f2=305, A1=0.5, A2=1.5, t_end=2, num_points=10000, show_plot=False)
+        sample_rate = 1 / (t[1] - t[0])
+        envelope, measured = analyze_beat_frequency(wave, sample_rate)
+        assert abs(measured - beat_freq) < 0.01
+        expected = np.sqrt(0.5**2 + 1.5**2 + 2 * 0.5 * 1.5 * np.cos(2 * np.pi * 5 * t))
+        np.testing.assert_allclose(envelope[500:-500], expected[500:-500], atol=1e-2)
+
+        envelope_blocked, measured_blocked = analyze_beat_frequency(
+            wave, sample_rate, block_size=4096, overlap=512)
+        assert len(envelope_blocked) == len(wave)
+        np.testing.assert_allclose(envelope_blocked[500:-500], envelope[500:-500], atol=1e-2)
+        assert abs(measured_blocked - beat_freq) < 0.01
+
+    def test_streaming_pipeline(self):
+        """分块生成、分块求包络、分段测频的流式管线"""
+        num_points, t_end = 400000, 40
+        chunks = (wave for _, wave in simulate_beat_frequency_chunks(
+            f1=440, f2=443, t_end=t_end, num_points=num_points, chunk_size=30000))
+        sample_rate = (num_points - 1) / t_end
+        measured = measure_beat_frequency(envelope_blocks(chunks, block_size=16384), sample_rate,
+                                          segment_size=32768)
+        assert abs(measured - 3) < 0.01
+
+    def test_error_bound_and_short_record_warning(self):
+        """至少 4 个拍周期时相对误差不超过 1e-3，更短的记录发出警告"""
+        sample_rate = 10000
+        for beat in (1.0, 3.3, 7.0):
+            for A2 in (1.0, 0.2):
+                t = np.arange(int(4 * sample_rate / beat)) / sample_rate
+                wave = np.sin(2 * np.pi * 440 * t) + A2 * np.sin(2 * np.pi * (440 + beat) * t + 1)
+                _, measured = analyze_beat_frequency(wave, sample_rate)
+                assert abs(measured - beat) / beat < 1e-3
+
+        _, wave, _ = simulate_beat_frequency_solution(f1=440, f2=441, num_points=10000, show_plot=False)
+        with pytest.warns(RuntimeWarning):
+            analyze_beat_frequency(wave, 9999)
+
+    def test_low_beat_at_audio_rate(self):
+        """音频采样率下的低拍频：频率分辨率应由记录时长决定"""
+        sample_rate, duration = 44100, 60
+        t = np.arange(sample_rate * duration) / sample_rate
+        wave = np.sin(2 * np.pi * 440 * t) + 0.8 * np.sin(2 * np.pi * 440.5 * t)
+        _, measured = analyze_beat_frequency(wave, sample_rate)
+        assert abs(measured - 0.5) < 1e-4
+
+class TestHeadlessRendering:
+    """测试非交互式并行渲染"""
+
+    def test_decimate_minmax(self):
+        """抽取后每列保留极值且点数受限"""
+        t = np.linspace(0, 1, 10000)
+        wave = np.sin(2 * np.pi * 50 * t)
+        t_dec, wave_dec = decimate_minmax(t, wave, 100)
+        assert len(wave_dec) == 200
+        assert np.all(np.diff(t_dec) >= 0)
+        assert np.isclose(wave_dec.max(), wave.max()) and np.isclose(wave_dec.min(), wave.min())
+
+    def test_decimate_keeps_tail(self):
+        """点数不能被列数整除时末尾的点也应保留"""
+        t = np.linspace(0, 1, 5000)
+        wave = np.sin(2 * np.pi * 3 * t) + (t > 0.99)
+        t_dec, wave_dec = decimate_minmax(t, wave, 600)
+        assert len(wave_dec) == 1200
+        assert t_dec[-1] > 0.998
+        assert np.isclose(wave_dec.max(), wave.max())
+
+    def test_render_to_files(self, tmp_path):
+        """非交互模式应写出全部子图文件"""
+        paths = parameter_sensitivity_analysis_solution(output_dir=str(tmp_path))
+        assert len(paths) == 8
+        assert all(os.path.getsize(path) > 0 for path in paths)
+
+        paths = parameter_sensitivity_analysis_solution(output_dir=str(tmp_path / "custom"), freq_diffs=[1, 3, 7],
+                                                        amplitude_ratios=[2.0], max_workers=1)
+        assert [os.path.basename(path) for path in paths] == [
+            'freq_diff_000.png', 'freq_diff_001.png', 'freq_diff_002.png', 'amplitude_ratio_000.png']
+
+class TestMultitone:
+    """测试 N 音叠加引擎"""
+
+    def test_two_tones_match_beat_simulation(self):
+        """两音情形应与 simulate_beat_frequency 一致"""
+        t_ref, wave_ref, _ = simulate_beat_frequency_solution(A1=0.5, A2=1.5, show_plot=False)
+        for method in ("direct", "fft"):
+            t, wave = simulate_multitone([440, 444], [0.5, 1.5], method=method)
+            np.testing.assert_allclose(t, t_ref)
+            np.testing.assert_allclose(wave, wave_ref, atol=1e-9)
+
+    def test_fft_matches_direct(self):
+        """FFT 合成与直接求和在任意频率下一致"""
+        rng = np.random.default_rng(1)
+        frequencies = rng.uniform(20, 2000, 40)
+        amplitudes = rng.uniform(0, 1, 40)
+        phases = rng.uniform(0, 2 * np.pi, 40)
+        _, wave_direct = simulate_multitone(frequencies, amplitudes, phases, t_start=0.3, t_end=2.1,
+                                            num_points=20001, method="direct")
+        _, wave_fft = simulate_multitone(frequencies, amplitudes, phases, t_start=0.3, t_end=2.1,
+                                         num_points=20001, method="fft")
+        assert np.max(np.abs(wave_fft - wave_direct)) < 1e-9 * amplitudes.sum()
+
+class TestFloat32Output:
+    """测试 float32 输出路径的误差界"""
+
+    def test_float32_error_budget(self):
+        """长时间跨度下 float32 结果相对 float64 的偏差应满足文档给出的误差界"""
+        bound = (0.5 + 1.5) * 2 * 2 * np.pi * np.finfo(np.float32).eps
+        for t_end in (1, 1000):
+            t64, wave64, _ = simulate_beat_frequency_solution(
+                A1=0.5, A2=1.5, t_end=t_end, num_points=100001, show_plot=False)
+            t32, wave32, _ = simulate_beat_frequency_solution(
+                A1=0.5, A2=1.5, t_end=t_end, num_points=100001, show_plot=False, dtype=np.float32)
+            assert t32.dtype == np.float32 and wave32.dtype == np.float32
+            # 64 位路径自身的相位舍入误差随 t 增长，一并计入
+            budget = bound + 2 * (2 * np.finfo(float).eps * 2 * np.pi * 444 * t_end + 1e-12)
+            assert np.max(np.abs(wave32 - wave64)) <= budget
+
+        # 朴素地用 float32 时间轴计算相位，在长跨度下误差远超上述误差界
+        naive = np.sin(2 * np.pi * np.float32(444) * t32) * np.float32(1.5) \
+            + np.sin(2 * np.pi * np.float32(440) * t32) * np.float32(0.5)
+        assert np.max(np.abs(naive - wave64)) > 100 * bound
+
+    def test_float32_batch_chunks_multitone(self):
+        """批量、分块与多音接口的 float32 输出"""
+        _, waves, _ = simulate_beat_frequency_batch([440, 300], [444, 305], num_points=3000, dtype=np.float32)
+        _, waves64, _ = simulate_beat_frequency_batch([440, 300], [444, 305], num_points=3000)
+        assert waves.dtype == np.float32
+        np.testing.assert_allclose(waves, waves64, atol=1e-5)
+
+        chunks = list(simulate_beat_frequency_chunks(num_points=3000, chunk_size=1000, dtype=np.float32))
+        assert all(w.dtype == np.float32 for _, w in chunks)
+        np.testing.assert_allclose(np.concatenate([w for _, w in chunks]), waves64[0], atol=1e-5)
+
+        for method in ("direct", "fft"):
+            t, wave = simulate_multitone([440, 444], [1.0, 1.0], num_points=3000, method=method, dtype=np.float32)
+            assert t.dtype == np.float32 and wave.dtype == np.float32
+            np.testing.assert_allclose(wave, waves64[0], atol=1e-5)
+
 if __name__ == "__main__":
     pytest.main(["-v", "--tb=line"])
@@ -21,6 +21,33 @@ from src.maxwell_distribution import (
     vp
 )
 
+import numpy as np
+from scipy.integrate import quad
+from solutions.maxwell_distribution_solution import (
+    maxwell_distribution as maxwell_distribution_solution,
+    maxwell_cdf,
+    interval_probability,
+    percentage_interval,
+    trapezoidal_rule,
+    simpson_rule,
+    romberg_rule,
+    gauss_legendre,
+    adaptive_simpson,
+    compare_methods,
+    percentage_0_to_vp as percentage_0_to_vp_solution,
+    percentage_0_to_vp_trap,
+    write_benchmark_results,
+    sample_maxwell_speeds,
+    sample_maxwell_speeds_parallel,
+    maxwell_speed_chunks,
+    maxwell_sf,
+    maxwell_log_sf,
+    log_interval_probability,
+    percentage_3e4_to_3e8 as percentage_3e4_to_3e8_solution,
+    most_probable_speed,
+    probability_table,
+)
+
 class TestMaxwellDistribution(unittest.TestCase):
 
     def test_maxwell_distribution(self):
@@ -40,5 +67,228 @@ class TestMaxwellDistribution(unittest.TestCase):
         percent = percentage_3e4_to_3e8(vp)
         self.assertAlmostEqual(percent, 0.0, places=6)
 
+class TestMaxwellCdf(unittest.TestCase):
+
+    def test_cdf_matches_quad(self):
+        # 闭式CDF应与数值积分一致
+        for upper in (0.3 * vp, vp, 2.5 * vp):
+            expected, _ = quad(maxwell_distribution_solution, 0, upper, args=(vp,))
+            self.assertAlmostEqual(float(maxwell_cdf(upper, vp)), expected, places=12)
+
+    def test_vectorized_intervals(self):
+        # v与vp数组广播
+        v = np.linspace(0, 5, 11)[:, None] * 1000
+        vps = np.array([500.0, 1578.0, 3000.0])
+        cdf = maxwell_cdf(v, vps)
+        self.assertEqual(cdf.shape, (11, 3))
+        self.assertTrue(np.all(np.diff(cdf, axis=0) >= 0))
+        np.testing.assert_allclose(interval_probability(0, np.inf, vps), 1.0)
+
+    def test_small_speed(self):
+        # 小x处 F ≈ (4/(3√π))·x³·(1 - 3x²/5)，erf(x) - (2/√π)·x·exp(-x²) 的相减会丢失精度
+        for x in (1e-3, 1e-6, 1e-7):
+            expected = 4 / (3 * np.sqrt(np.pi)) * x**3 * (1 - 0.6 * x**2)
+            self.assertAlmostEqual(float(maxwell_cdf(x * vp, vp)) / expected, 1.0, places=12)
+        x = 1e-6 / vp
+        self.assertAlmostEqual(float(interval_probability(0, 1e-6, vp)) / (4 / (3 * np.sqrt(np.pi)) * x**3), 1.0,
+                               places=12)
+
+    def test_negative_speed(self):
+        # 速率非负，负的下限等价于0
+        self.assertEqual(float(maxwell_cdf(-1.0, vp)), 0.0)
+        self.assertEqual(float(maxwell_sf(-vp, vp)), 1.0)
+        self.assertEqual(float(maxwell_log_sf(-vp, vp)), 0.0)
+        self.assertAlmostEqual(float(interval_probability(-vp, vp, vp)), float(maxwell_cdf(vp, vp)), places=15)
+
+    def test_percentage_interval(self):
+        self.assertAlmostEqual(percentage_interval(0, vp, vp), 100 * float(maxwell_cdf(vp, vp)))
+        self.assertAlmostEqual(percentage_interval(0, 3.3 * vp, vp),
+                               100 * float(interval_probability(0, 3.3 * vp, vp)))
+
+class TestTrapezoidalRule(unittest.TestCase):
+
+    def test_matches_loop(self):
+        # 向量化结果与逐点循环的梯形法则一致
+        f = lambda v: maxwell_distribution_solution(v, vp)
+        n = 1000
+        h = vp / n
+        expected = 0.5 * (f(0) + f(vp)) + sum(f(i * h) for i in range(1, n))
+        self.assertAlmostEqual(trapezoidal_rule(f, 0, vp, n), expected * h, places=12)
+
+    def test_chunked_and_scalar_fallback(self):
+        import math
+        exact = 1 - math.exp(-1)
+        vectorized = trapezoidal_rule(np.exp, -1, 0, 10**5)
+        chunked = trapezoidal_rule(np.exp, -1, 0, 10**5, chunk_size=777)
+        scalar_only = trapezoidal_rule(math.exp, -1, 0, 10**4)
+        self.assertAlmostEqual(chunked, vectorized, places=12)
+        self.assertAlmostEqual(vectorized, exact, places=9)
+        self.assertAlmostEqual(scalar_only, exact, places=8)
+
+class TestQuadratureSuite(unittest.TestCase):
+
+    def setUp(self):
+        self.f = lambda v: maxwell_distribution_solution(v, vp)
+        self.exact = float(maxwell_cdf(3 * vp, vp))
+
+    def test_fixed_rules(self):
+        self.assertAlmostEqual(simpson_rule(self.f, 0, 3 * vp, 1001), self.exact, places=10)
+        self.assertAlmostEqual(gauss_legendre(self.f, 0, 3 * vp, 40), self.exact, places=12)
+        # 辛普森法对三次多项式精确
+        self.assertAlmostEqual(simpson_rule(lambda x: x**3, 0, 2, 2), 4.0, places=12)
+
+    def test_romberg_reuses_evaluations(self):
+        calls = []
+        def counted(x):
+            calls.append(np.size(x))
+            return self.f(x)
+        result = romberg_rule(counted, 0, 3 * vp, tol=1e-12)
+        self.assertAlmostEqual(result, self.exact, places=11)
+        # 每级只求新增中点：总求值次数为 2^k + 1
+        intervals = sum(calls) - 1
+        self.assertEqual(intervals & (intervals - 1), 0)
+
+    def test_adaptive_simpson_error_estimate(self):
+        result, error = adaptive_simpson(self.f, 0, 3 * vp, tol=1e-10)
+        self.assertLess(abs(result - self.exact), 1e-9)
+        self.assertLess(error, 1e-9)
+
+    def test_wide_interval_not_spurious_zero(self):
+        # [0, 3e8] 上粗网格的采样点全部落在密度下溢为0的区域，不能据此给出0
+        result, error = adaptive_simpson(self.f, 0, 3e8)
+        self.assertAlmostEqual(result, 1.0, places=12)
+        self.assertLess(error, 1e-10)
+        result, _ = adaptive_simpson(self.f, 3e4, 3e8)
+        self.assertAlmostEqual(result / 2.3091655663722e-156, 1.0, places=8)
+        # 默认级数不足以分辨时给出警告而不是静默返回
+        with self.assertWarns(RuntimeWarning):
+            self.assertGreater(romberg_rule(self.f, 0, 3e8), 0.5)
+        self.assertAlmostEqual(romberg_rule(self.f, 0, 3e8, max_levels=24), 1.0, places=10)
+
+    def test_adaptive_simpson_degenerate_cases(self):
+        # 空区间直接返回 0
+        self.assertEqual(adaptive_simpson(self.f, vp, vp), (0.0, 0.0))
+        # 被积函数出现 nan 时不会无限二分，误差估计报告为 inf
+        result, error = adaptive_simpson(lambda x: np.where(x > 0.5, np.nan, x), 0, 1)
+        self.assertTrue(np.isnan(result))
+        self.assertEqual(error, np.inf)
+
+    def test_compare_methods_report(self):
+        results = compare_methods("0到vp", percentage_0_to_vp_solution, percentage_0_to_vp_trap, vp,
+                                  n_values=[10, 100], bounds=(0, vp), repeat=3, warmup=1)
+        methods = {row["method"] for row in results}
+        self.assertEqual(methods, {"percentage_0_to_vp", "percentage_0_to_vp_trap", "quad", "trapezoid",
+                                   "simpson", "gauss_legendre", "romberg", "adaptive_simpson"})
+        self.assertTrue(all(row["evaluations"] > 0 for row in results))
+        self.assertTrue(all(row["median_ns"] > 0 and row["iqr_ns"] >= 0 for row in results))
+        # 固定步长方法单次积分的求值次数为 n + 1，任务函数的梯形积分同样计数
+        for method in ("trapezoid", "percentage_0_to_vp_trap"):
+            rows = [row for row in results if row["method"] == method]
+            self.assertEqual([row["evaluations"] for row in rows], [11, 101])
+
+class TestBenchmarkOutput(unittest.TestCase):
+
+    def test_json_and_csv_output(self):
+        import csv
+        import json
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "bench.json")
+            csv_path = os.path.join(tmp, "bench.csv")
+            results = compare_methods("0到vp", percentage_0_to_vp_solution, percentage_0_to_vp_trap, vp,
+                                      n_values=[10], repeat=2, warmup=0, output=json_path)
+            write_benchmark_results(results, csv_path)
+            with open(json_path, encoding="utf-8") as fh:
+                self.assertEqual(len(json.load(fh)), len(results))
+            with open(csv_path, encoding="utf-8") as fh:
+                rows = list(csv.DictReader(fh))
+            self.assertEqual(len(rows), len(results))
+            self.assertIn("median_ns", rows[0])
+
+class TestMaxwellSampler(unittest.TestCase):
+
+    def check_distribution(self, speeds):
+        from scipy.stats import kstest
+        # KS检验与直方图均与理论分布一致
+        self.assertGreater(kstest(speeds, lambda v: maxwell_cdf(v, vp)).pvalue, 1e-3)
+        counts, edges = np.histogram(speeds, bins=40, range=(0, 4 * vp), density=True)
+        centers = 0.5 * (edges[1:] + edges[:-1])
+        np.testing.assert_allclose(counts, maxwell_distribution_solution(centers, vp), atol=0.03 / vp)
+
+    def test_methods_match_distribution(self):
+        for method in ("gaussian", "inverse_cdf"):
+            speeds = sample_maxwell_speeds(vp, 200000, rng=np.random.default_rng(42), method=method,
+                                           chunk_size=30000)
+            self.assertEqual(speeds.shape, (200000,))
+            self.check_distribution(speeds)
+
+    def test_seeded_chunks_reproducible(self):
+        whole = sample_maxwell_speeds(vp, 10000, rng=7, chunk_size=3000)
+        chunks = np.concatenate(list(maxwell_speed_chunks(vp, 10000, rng=7, chunk_size=3000)))
+        np.testing.assert_array_equal(whole, chunks)
+
+    def test_parallel_independent_streams(self):
+        first = sample_maxwell_speeds_parallel(vp, 100000, seed=3, n_workers=2)
+        second = sample_maxwell_speeds_parallel(vp, 100000, seed=3, n_workers=2)
+        np.testing.assert_array_equal(first, second)
+        self.assertFalse(np.array_equal(first[:50000], first[50000:]))
+        self.check_distribution(first)
+
+class TestMaxwellTail(unittest.TestCase):
+
+    def test_sf_complements_cdf(self):
+        v = np.linspace(0, 4 * vp, 50)
+        np.testing.assert_allclose(maxwell_sf(v, vp) + maxwell_cdf(v, vp), 1.0, atol=1e-15)
+
+    def test_far_tail(self):
+        # 3e4 m/s 处 x ≈ 19，尾部概率约为 2.3e-156，1 - F 的相减只能得到0
+        expected = 2.3091655663722e-156
+        self.assertAlmostEqual(float(maxwell_sf(3e4, vp)) / expected, 1.0, places=10)
+        self.assertAlmostEqual(float(interval_probability(3e4, 3e8, vp)) / expected, 1.0, places=10)
+        # 裁剪后的quad积分不再给出虚假的0
+        self.assertAlmostEqual(percentage_3e4_to_3e8_solution(vp) / (100 * expected), 1.0, places=6)
+
+    def test_log_space(self):
+        x = 1000.0
+        log_s = float(maxwell_log_sf(x * vp, vp))
+        self.assertEqual(float(maxwell_sf(x * vp, vp)), 0.0)
+        # 渐近式 erfcx(x) ≈ 1/(x√π)
+        self.assertAlmostEqual(log_s, -x**2 + np.log((2 * x + 1 / x) / np.sqrt(np.pi)), places=6)
+        self.assertAlmostEqual(float(log_interval_probability(3e4, 3e8, vp)), np.log(2.3091655663722e-156),
+                               places=9)
+
+class TestProbabilityTable(unittest.TestCase):
+
+    def test_table_matches_interval_probability(self):
+        temperatures = np.array([100.0, 300.0, 1000.0, 3000.0])
+        molar_masses = np.array([0.002016, 0.004003, 0.028014])
+        edges = np.linspace(0, 8000, 41)
+        table = probability_table(temperatures[None, :], molar_masses[:, None], edges, chunk_elements=100)
+        self.assertEqual(table.shape, (12, 40))
+
+        vps = most_probable_speed(temperatures[None, :], molar_masses[:, None]).ravel()
+        expected = interval_probability(edges[None, :-1], edges[None, 1:], vps[:, None])
+        np.testing.assert_allclose(table, expected, atol=1e-14)
+        # 远尾区间不因CDF相减而变成0
+        tail = probability_table(300, 0.002016, [3e4, 3e5])
+        self.assertGreater(float(tail[0, 0]), 0.0)
+        self.assertAlmostEqual(float(tail[0, 0]) / float(interval_probability(3e4, 3e5, vps[1])), 1.0, places=12)
+        np.testing.assert_array_equal(probability_table(300, 0.002016, edges)[0],
+                                      interval_probability(edges[:-1], edges[1:], vps[1]))
+        # 氢气在300K下的最概然速率约为1573 m/s
+        self.assertAlmostEqual(float(most_probable_speed(300, 0.002016)), 1573, delta=1)
+
+    def test_threaded_memmap_output(self):
+        import tempfile
+        edges = np.linspace(0, 5000, 101)
+        temperatures = np.linspace(50, 2000, 300)
+        serial = probability_table(temperatures, 0.028014, edges)
+        with tempfile.TemporaryDirectory() as tmp:
+            out = np.lib.format.open_memmap(os.path.join(tmp, "table.npy"), mode="w+", shape=(300, 100))
+            result = probability_table(temperatures, 0.028014, edges, out=out, chunk_elements=1000, n_threads=4)
+            self.assertIs(result, out)
+            np.testing.assert_array_equal(np.asarray(out), serial)
+            del result, out
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
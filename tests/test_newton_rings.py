@@ -8,6 +8,22 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 #from solutions.newton_rings_solution import setup_parameters, generate_grid, calculate_intensity, plot_newton_rings
 from src.newton_rings import setup_parameters, generate_grid, calculate_intensity, plot_newton_rings
+from solutions.newton_rings_solution import (
+    generate_grid as generate_grid_solution,
+    calculate_intensity as calculate_intensity_solution,
+    generate_axes,
+    calculate_intensity_tiled,
+    calculate_intensity_radial,
+    calculate_intensity_polychromatic,
+    linear_to_srgb,
+    srgb_response,
+    radial_profile,
+    find_dark_rings,
+    fit_ring_parameters,
+    analyze_ring_images,
+    calculate_intensity_surface,
+    render_ring_sweep,
+)
 
 class TestNewtonRingsSolution(unittest.TestCase):
 
@@ -33,5 +49,216 @@ class TestNewtonRingsSolution(unittest.TestCase):
         # 检查强度值是否在合理范围内
         self.assertTrue(np.all(intensity >= 0) and np.all(intensity <= 4.1))
 
+class TestTiledIntensity(unittest.TestCase):
+
+    def test_tiled_matches_full_grid(self):
+        lambda_light, R_lens = setup_parameters()
+        _, _, r = generate_grid_solution()
+        expected = calculate_intensity_solution(r, lambda_light, R_lens)
+        x, y = generate_axes()
+        for n_threads in (None, 3):
+            intensity = calculate_intensity_tiled(x, y, lambda_light, R_lens, tile_size=300, n_threads=n_threads)
+            np.testing.assert_allclose(intensity, expected, atol=1e-9)
+
+    def test_memmap_output(self):
+        import tempfile
+        lambda_light, R_lens = setup_parameters()
+        x, y = generate_axes(num_points=500)
+        y = y[:400]
+        with tempfile.TemporaryDirectory() as tmp:
+            out = np.lib.format.open_memmap(os.path.join(tmp, "rings.npy"), mode="w+", shape=(400, 500))
+            result = calculate_intensity_tiled(x, y, lambda_light, R_lens, out=out, tile_size=128)
+            self.assertIs(result, out)
+            self.assertTrue(np.all((np.asarray(out) >= 0) & (np.asarray(out) <= 4)))
+            del result, out
+
+class TestRadialIntensity(unittest.TestCase):
+
+    def test_accuracy_against_direct(self):
+        lambda_light, R_lens = setup_parameters()
+        for num_points in (600, 601):
+            x, y = generate_axes(num_points)
+            expected = calculate_intensity_tiled(x, y, lambda_light, R_lens)
+            for symmetry in (None, "quadrant", "octant"):
+                linear = calculate_intensity_radial(x, y, lambda_light, R_lens, symmetry=symmetry, band_size=100)
+                nearest = calculate_intensity_radial(x, y, lambda_light, R_lens, method="nearest",
+                                                     symmetry=symmetry, band_size=100)
+                self.assertLessEqual(np.max(np.abs(linear - expected)), 1.01e-6)
+                self.assertLessEqual(np.max(np.abs(nearest - expected)), 1.01e-3)
+
+    def test_asymmetric_axes(self):
+        # 坐标不对称时自动退回完整计算
+        lambda_light, R_lens = setup_parameters()
+        x = np.linspace(-0.0005, 0.001, 300)
+        y = np.linspace(0, 0.001, 200)
+        expected = calculate_intensity_tiled(x, y, lambda_light, R_lens)
+        result = calculate_intensity_radial(x, y, lambda_light, R_lens, symmetry="octant")
+        self.assertLessEqual(np.max(np.abs(result - expected)), 1.01e-6)
+
+class TestStableIntensity(unittest.TestCase):
+
+    def test_matches_reference_formula(self):
+        lambda_light, R_lens = setup_parameters()
+        _, _, r = generate_grid_solution()
+        reference = 4 * np.sin(2 * np.pi * (R_lens - np.sqrt(R_lens**2 - r**2)) / lambda_light)**2
+        np.testing.assert_allclose(calculate_intensity_solution(r, lambda_light, R_lens), reference, atol=1e-9)
+
+    def test_scalar_input(self):
+        lambda_light, R_lens = setup_parameters()
+        result = calculate_intensity_solution(0.0005, lambda_light, R_lens)
+        self.assertTrue(np.isscalar(result))
+        self.assertAlmostEqual(result, 4 * np.sin(2 * np.pi * (R_lens - np.sqrt(R_lens**2 - 0.0005**2))
+                                                  / lambda_light)**2, places=9)
+
+    def test_in_place_output(self):
+        lambda_light, R_lens = setup_parameters()
+        r = np.linspace(0, 0.001, 1000)
+        out = np.empty_like(r)
+        result = calculate_intensity_solution(r, lambda_light, R_lens, out=out)
+        self.assertIs(result, out)
+        np.testing.assert_array_equal(out, calculate_intensity_solution(r, lambda_light, R_lens))
+
+    def test_float32_ring_positions(self):
+        lambda_light, R_lens = setup_parameters()
+        r = np.linspace(0, 0.001, 100001)
+        expected = calculate_intensity_solution(r, lambda_light, R_lens)
+        result = calculate_intensity_solution(r, lambda_light, R_lens, dtype=np.float32)
+        self.assertEqual(result.dtype, np.float32)
+        self.assertLess(np.max(np.abs(result - expected)), 1e-4)
+        # 暗环（强度极小值）位置不变
+        minima = lambda I: np.flatnonzero((I[1:-1] < I[:-2]) & (I[1:-1] <= I[2:])) + 1
+        np.testing.assert_array_equal(minima(result), minima(expected))
+        # 相比之下，float32 下的 R - sqrt(R² - r²) 误差大得多
+        r32 = r.astype(np.float32)
+        naive = 4 * np.sin(2 * np.pi * (np.float32(R_lens) - np.sqrt(np.float32(R_lens)**2 - r32**2))
+                           / np.float32(lambda_light))**2
+        self.assertGreater(np.max(np.abs(naive - expected)), 100 * np.max(np.abs(result - expected)))
+
+class TestPolychromaticIntensity(unittest.TestCase):
+
+    def test_matches_per_wavelength_sum(self):
+        _, R_lens = setup_parameters()
+        x, y = generate_axes(201)
+        wavelengths = np.linspace(400e-9, 700e-9, 31)
+        weights = np.random.default_rng(0).uniform(0.5, 1.0, 31)
+        total = calculate_intensity_polychromatic(x, y, wavelengths, weights, R_lens, response=weights[:, None])
+        self.assertEqual(total.shape, (201, 201, 1))
+        expected = sum(w * calculate_intensity_tiled(x, y, lam, R_lens) for lam, w in zip(wavelengths, weights))
+        self.assertLess(np.max(np.abs(total[..., 0] - expected)), 1e-4 * weights.sum())
+
+    def test_white_light_rgb(self):
+        _, R_lens = setup_parameters()
+        x, y = generate_axes(301)
+        wavelengths = np.linspace(380e-9, 780e-9, 400)
+        rgb = calculate_intensity_polychromatic(x, y, wavelengths, np.ones(400), R_lens)
+        self.assertEqual(rgb.shape, (301, 301, 3))
+        # 中心为暗斑，外围条纹被平均成光源本身的颜色
+        np.testing.assert_allclose(rgb[150, 150], 0, atol=1e-12)
+        corner = rgb[:20, :20].reshape(-1, 3).mean(axis=0)
+        source_color = 2 * srgb_response(wavelengths, np.ones(400)).sum(axis=0)
+        np.testing.assert_allclose(corner, source_color, atol=0.02)
+        display = linear_to_srgb(rgb)
+        self.assertTrue(np.all((display >= 0) & (display <= 1)))
+
+class TestRingAnalysis(unittest.TestCase):
+
+    def setUp(self):
+        self.lambda_light, self.R_lens = setup_parameters()
+        self.x, self.y = generate_axes(1001)
+        self.pixel_size = self.x[1] - self.x[0]
+
+    def test_fit_synthetic_image(self):
+        image = calculate_intensity_tiled(self.x, self.y, self.lambda_light, self.R_lens)
+        radii, profile = radial_profile(image, self.pixel_size)
+        rings = find_dark_rings(radii, profile)
+        # 暗环半径满足 r_m = sqrt(mλR)
+        expected = np.sqrt(np.arange(1, len(rings) + 1) * self.lambda_light * self.R_lens)
+        np.testing.assert_allclose(rings, expected, rtol=2e-3)
+        self.assertAlmostEqual(fit_ring_parameters(rings, lambda_light=self.lambda_light) / self.R_lens, 1, places=3)
+        self.assertAlmostEqual(fit_ring_parameters(rings, R_lens=self.R_lens) / self.lambda_light, 1, places=3)
+
+    def test_batch_with_noise(self):
+        rng = np.random.default_rng(0)
+        images = np.stack([calculate_intensity_tiled(self.x, self.y, self.lambda_light, R) for R in (0.08, 0.12)])
+        images += rng.normal(0, 0.2, images.shape)
+        fitted = analyze_ring_images(images, self.pixel_size, lambda_light=self.lambda_light, n_workers=2)
+        np.testing.assert_allclose(fitted, [0.08, 0.12], rtol=5e-3)
+
+class TestSurfaceIntensity(unittest.TestCase):
+
+    def setUp(self):
+        self.lambda_light, self.R_lens = setup_parameters()
+        self.x, self.y = generate_axes(301)
+
+    def test_ideal_sphere_matches_tiled(self):
+        expected = calculate_intensity_tiled(self.x, self.y, self.lambda_light, self.R_lens)
+        result = calculate_intensity_surface(self.x, self.y, self.lambda_light, self.R_lens, tile_size=64)
+        np.testing.assert_allclose(result, expected, atol=1e-12)
+
+    def test_matches_direct_formula(self):
+        conic, aspheric, (x0, y0), (tx, ty), gap = -0.5, (2.0, -3e5), (1e-4, -5e-5), (2e-4, -1e-4), 1e-7
+        X, Y = np.meshgrid(self.x - x0, self.y - y0)
+        rho2 = X**2 + Y**2
+        c = 1 / self.R_lens
+        thickness = c * rho2 / (1 + np.sqrt(1 - (1 + conic) * c**2 * rho2)) \
+            + aspheric[0] * rho2**2 + aspheric[1] * rho2**3 + tx * X + ty * Y + gap
+        expected = 4 * np.sin(2 * np.pi * thickness / self.lambda_light)**2
+        out = np.empty_like(expected)
+        result = calculate_intensity_surface(self.x, self.y, self.lambda_light, self.R_lens, conic, aspheric,
+                                             (x0, y0), (tx, ty), gap, out=out, tile_size=100, n_threads=2)
+        self.assertIs(result, out)
+        np.testing.assert_allclose(result, expected, atol=1e-9)
+
+    def test_fit_decenter_and_tilt(self):
+        from scipy.optimize import least_squares
+        x, y = generate_axes(96)
+        truth = np.array([3e-5, -2e-5, 1e-4])
+        target = calculate_intensity_surface(x, y, self.lambda_light, self.R_lens,
+                                             decenter=truth[:2], tilt=(truth[2], 0.0))
+        buffer = np.empty_like(target)
+
+        def residual(p):
+            scaled = p * 1e-5
+            model = calculate_intensity_surface(x, y, self.lambda_light, self.R_lens, decenter=scaled[:2],
+                                                tilt=(scaled[2], 0.0), out=buffer)
+            return (model - target).ravel()
+
+        fit = least_squares(residual, truth / 1e-5 + [0.3, -0.3, 0.5])
+        np.testing.assert_allclose(fit.x * 1e-5, truth, atol=1e-9)
+
+class TestRingSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.lambda_light, self.R_lens = setup_parameters()
+        self.x, self.y = generate_axes(120)
+
+    def test_npy_stack(self):
+        import tempfile
+        gaps = np.linspace(0, self.lambda_light / 2, 5)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = render_ring_sweep(os.path.join(tmpdir, 'sweep.npy'), 'gap', gaps, self.x, self.y,
+                                     n_workers=2, frames_per_task=2)
+            frames = np.load(path)
+        self.assertEqual(frames.shape, (5, 120, 120))
+        self.assertEqual(frames.dtype, np.uint8)
+        for gap, frame in zip(gaps, frames):
+            expected = calculate_intensity_surface(self.x, self.y, self.lambda_light, self.R_lens, gap=gap)
+            self.assertLessEqual(np.max(np.abs(frame - expected * 255 / 4)), 0.51)
+        # 间隙变化半个波长后图样复原
+        np.testing.assert_allclose(frames[0], frames[-1], atol=1)
+
+    def test_png_sequence(self):
+        import tempfile
+        from matplotlib.image import imread
+        wavelengths = [450e-9, 550e-9, 650e-9]
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = render_ring_sweep(tmpdir, 'lambda_light', wavelengths, self.x, self.y, fmt='png', n_workers=1)
+            self.assertEqual(len(paths), 3)
+            for wavelength, path in zip(wavelengths, paths):
+                image = np.rint(imread(path) * 255)
+                expected = calculate_intensity_solution(np.hypot(*np.meshgrid(self.x, self.y)), wavelength,
+                                                        self.R_lens)
+                self.assertLessEqual(np.max(np.abs(image - expected * 255 / 4)), 0.51)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -8,6 +8,17 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 #from solutions.spring_block_solution import solve_ode_euler, spring_mass_ode_func, solve_ode_odeint
 from src.spring_block import solve_ode_euler, spring_mass_ode_func, solve_ode_odeint
+from solutions.spring_block_solution import (
+    solve_ode_euler as solve_ode_euler_solution,
+    solve_ode_batch,
+    solve_ode_exact,
+    solve_ode_ivp,
+    spring_mass_rhs,
+    benchmark_ode_backends,
+    chain_stiffness_matrix,
+    solve_chain,
+    solve_chain_modes,
+)
 
 def test_solve_ode_euler():
     """测试欧拉法求解器"""
@@ -69,5 +80,143 @@ def test_solve_ode_odeint():
     assert np.allclose(energy, energy[0], rtol=0.05, atol=1e-6)
 
 
+def test_batch_euler_matches_scalar():
+    """批量欧拉法应与标量循环逐点一致"""
+    time_ref, position_ref, velocity_ref = solve_ode_euler_solution(100)
+    time_points, position, velocity = solve_ode_batch([0, 0], 1, method="euler")
+    assert position.shape == (2, 101)
+    assert np.allclose(time_points, time_ref)
+    assert np.array_equal(position[1], position_ref)
+    assert np.array_equal(velocity[1], velocity_ref)
+
+
+@pytest.mark.parametrize("method, order", [("symplectic_euler", 1), ("verlet", 2), ("rk4", 4)])
+def test_batch_convergence_order(method, order):
+    """各方法相对解析解的误差按步长的相应阶数减小"""
+    x0 = np.array([1.0, 0.0, -0.5])
+    v0 = np.array([0.0, 2.0, 1.0])
+    k = np.array([1.0, 4.0, 0.5])
+    m = np.array([1.0, 2.0, 3.0])
+    omega = np.sqrt(k / m)[:, np.newaxis]
+    errors = []
+    for step_num in (200, 400):
+        time_points, position, _ = solve_ode_batch(x0, v0, k, m, step_num, 10 / step_num, method)
+        exact = x0[:, np.newaxis] * np.cos(omega * time_points) + (v0[:, np.newaxis] / omega) * np.sin(omega * time_points)
+        errors.append(np.max(np.abs(position - exact)))
+    assert np.isclose(np.log2(errors[0] / errors[1]), order, atol=0.3)
+
+
+def test_symplectic_long_time_energy():
+    """辛方法用大步长长时间积分，能量误差保持有界"""
+    rng = np.random.default_rng(0)
+    k = rng.uniform(0.5, 2, 50)
+    x0 = rng.normal(size=50)
+    _, position, velocity = solve_ode_batch(x0, 0, k, 1, step_num=20000, time_step=0.1, method="verlet")
+    energy = 0.5 * (velocity**2 + k[:, np.newaxis] * position**2)
+    assert np.max(np.abs(energy / energy[:, :1] - 1)) < 0.06
+
+    _, position, velocity = solve_ode_batch(x0, 0, k, 1, step_num=20000, time_step=0.1, method="euler")
+    energy = 0.5 * (velocity**2 + k[:, np.newaxis] * position**2)
+    assert np.min(energy[:, -1] / energy[:, 0]) > 1e10
+
+
+def test_exact_free_oscillation():
+    """无阻尼情形长时间仍与解析解一致到舍入误差"""
+    time_points, position, velocity = solve_ode_exact(100000, time_step=0.01)
+    assert np.max(np.abs(position - np.sin(time_points))) < 1e-11
+    assert np.max(np.abs(velocity - np.cos(time_points))) < 1e-11
+
+    # 默认网格与 solve_ode_euler 相同，任意时间点的结果与均匀网格一致
+    time_points, position, _ = solve_ode_exact(100)
+    assert np.isclose(time_points[1], 2 * np.pi / 100)
+    _, position_any, _ = solve_ode_exact(time_points=time_points[::7])
+    assert np.allclose(position_any, position[::7], rtol=0, atol=1e-13)
+
+
+def test_exact_damped_driven():
+    """从稳态初值出发的受迫阻尼振动应始终保持在稳态解上"""
+    k, m, damping, force, omega = 3.0, 0.5, 0.4, 2.0, 1.7
+    gamma, omega0_squared = damping / m, k / m
+    amplitude = force / m / np.hypot(omega0_squared - omega**2, gamma * omega)
+    delta = np.arctan2(gamma * omega, omega0_squared - omega**2)
+    time_points = np.linspace(0, 50, 401)
+    _, position, velocity = solve_ode_exact(
+        x0=amplitude * np.cos(delta), v0=amplitude * omega * np.sin(delta), k=k, m=m, damping=damping,
+        drive_amplitude=force, drive_frequency=omega, time_points=time_points)
+    assert np.allclose(position, amplitude * np.cos(omega * time_points - delta), rtol=0, atol=1e-12)
+    assert np.allclose(velocity, -amplitude * omega * np.sin(omega * time_points - delta), rtol=0, atol=1e-12)
+
+    # 恒力下最终停在平衡位置 Fc / k
+    _, position, _ = solve_ode_exact(2000, k=k, m=m, damping=damping, constant_force=force, time_step=0.1)
+    assert np.isclose(position[-1], force / k, rtol=0, atol=1e-12)
+
+
+def test_ivp_dense_output():
+    """连续解可在任意时间求值，且与精确解一致"""
+    time_points, position, velocity, result = solve_ode_ivp(100)
+    assert len(position) == 101 and np.isclose(time_points[-1], 2 * np.pi)
+    assert np.allclose(position, np.sin(time_points), rtol=0, atol=1e-7)
+    query = np.array([0.123, 1.5, 4.75])
+    assert np.allclose(result.sol(query)[0], np.sin(query), rtol=0, atol=1e-7)
+
+    # 右端函数按列向量化
+    states = np.array([[0.0, 1.0, -1.0], [1.0, 0.0, 0.0]])
+    assert np.allclose(spring_mass_rhs(0, states), [[1, 0, 0], [0, -1, 1]])
+
+
+@pytest.mark.parametrize("method", ["Radau", "BDF", "LSODA"])
+def test_ivp_stiff(method):
+    """大 k、强阻尼的刚性参数下隐式方法仍与精确解一致"""
+    k, damping = 1e6, 1e5
+    time_points, position, _, _ = solve_ode_ivp(50, k=k, damping=damping, t_end=1.0, method=method)
+    _, reference, _ = solve_ode_exact(k=k, damping=damping, time_points=time_points)
+    assert np.max(np.abs(position - reference)) < 1e-8
+
+
+def test_benchmark_rows():
+    rows = benchmark_ode_backends(parameter_sets=[(1e4, 1.0, 1e3)], methods=("BDF",), repeat=1)
+    assert [row["backend"] for row in rows] == ["odeint", "solve_ivp/BDF"]
+    assert all(row["rhs_calls"] > 0 and row["seconds"] > 0 and row["max_error"] < 1e-6 for row in rows)
+
+
+def test_chain_stiffness_matrix():
+    """刚度矩阵为对称三对角的稀疏矩阵"""
+    k = np.array([1.0, 2.0, 3.0, 4.0])
+    stiffness = chain_stiffness_matrix(k, np.ones(3))
+    assert stiffness.nnz == 7
+    assert np.allclose(stiffness.toarray(), [[3, -2, 0], [-2, 5, -3], [0, -3, 7]])
+    free = chain_stiffness_matrix([2.0, 3.0], np.ones(3), boundary="free")
+    assert np.allclose(free.toarray().sum(axis=1), 0)
+
+
+def test_chain_single_mass_matches_oscillator():
+    """单个质点、两端固定的链等价于 k = k1 + k2 的弹簧振子"""
+    time_points, position, velocity = solve_chain_modes(0.0, 1.0, [0.5, 1.5], 2.0, np.linspace(0, 10, 11))
+    omega = 1.0
+    assert np.allclose(position[:, 0], np.sin(omega * time_points))
+    assert np.allclose(velocity[:, 0], np.cos(omega * time_points))
+
+
+@pytest.mark.parametrize("boundary, n_springs", [("fixed", 41), ("free", 39)])
+def test_chain_verlet_matches_normal_modes(boundary, n_springs):
+    """辛积分与简正模式解析解一致，并保持能量与（自由边界下的）动量"""
+    rng = np.random.default_rng(0)
+    k = rng.uniform(0.5, 2, n_springs)
+    m = rng.uniform(0.5, 2, 40)
+    x0 = rng.normal(size=40)
+    v0 = rng.normal(size=40)
+    time_points, position, velocity = solve_chain(x0, v0, k, m, 0.002, 5000, boundary, save_every=500)
+    assert position.shape == (11, 40)
+    _, position_ref, velocity_ref = solve_chain_modes(x0, v0, k, m, time_points, boundary)
+    assert np.max(np.abs(position - position_ref)) < 1e-3
+    assert np.max(np.abs(velocity - velocity_ref)) < 1e-3
+
+    stiffness = chain_stiffness_matrix(k, m, boundary)
+    energy = 0.5 * np.sum(m * velocity**2, axis=1) + 0.5 * np.einsum("ti,ti->t", position, (stiffness @ position.T).T)
+    assert np.allclose(energy, energy[0], rtol=1e-4)
+    if boundary == "free":
+        assert np.allclose(velocity @ m, v0 @ m)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
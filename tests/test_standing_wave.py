@@ -8,6 +8,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 #from solutions.standing_wave_solution import sineWaveZeroPhi, init, animate, lines, x
 from src.standing_wave import sineWaveZeroPhi, init, animate, lines, x
+from solutions.standing_wave_solution import sineWaveZeroPhi as sineWaveZeroPhi_solution
 
 class TestStandingWave(unittest.TestCase):
     def test_sineWaveZeroPhi(self):
@@ -72,5 +73,21 @@ class TestStandingWave(unittest.TestCase):
         # 验证求和结果
         np.testing.assert_array_almost_equal(actual_y3, expected_y3, decimal=6)
 
+class TestStandingWaveDtype(unittest.TestCase):
+    def test_float32_error_budget(self):
+        '''
+        测试 float32 输出相对 float64 的误差界，包括很大的 t
+        '''
+        A = 1.5
+        omega = 2 * np.pi
+        k = np.pi / 2
+        x_test = np.linspace(0, 10, 1000)
+        bound = A * 2 * 2 * np.pi * np.finfo(np.float32).eps
+        for t_test in (0.1, 1e3, 1e6):
+            expected = sineWaveZeroPhi_solution(x_test, t_test, A, omega, k)
+            result = sineWaveZeroPhi_solution(x_test, t_test, A, omega, k, dtype=np.float32)
+            self.assertEqual(result.dtype, np.float32)
+            self.assertLessEqual(np.max(np.abs(result - expected)), bound)
+
 if __name__ == '__main__':
     unittest.main()